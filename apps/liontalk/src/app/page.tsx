@@ -5,6 +5,7 @@ import React, { useState, useMemo } from 'react';
 import rawData from '../data/seminars.json'; 
 import { Seminar, SeminarSeriesData } from '../types';
 import { SeminarCard } from '../components/SeminarCard';
+import { getSeminarTimes, getSortKey } from '../utils/dates';
 
 export default function Home() {
   const [searchQuery, setSearchQuery] = useState('');
@@ -38,7 +39,10 @@ export default function Home() {
         s.date.toLowerCase().includes(query) ||
         s.location.toLowerCase().includes(query) ||
         s.department.toLowerCase().includes(query) ||
-        (s.series && s.series.toLowerCase().includes(query))
+        (s.series && s.series.toLowerCase().includes(query)) ||
+        (s.cross_listed ?? []).some((listing) =>
+          listing.department.toLowerCase().includes(query) || listing.series.toLowerCase().includes(query)
+        )
       );
     });
 
@@ -46,31 +50,34 @@ export default function Home() {
     const upcomingList: Seminar[] = [];
     const pastList: Seminar[] = [];
 
+    const tomorrow = new Date(today);
+    tomorrow.setDate(today.getDate() + 1);
+
     filtered.forEach((seminar) => {
-      const seminarDate = new Date(seminar.date);
-      seminarDate.setHours(0, 0, 0, 0);
+      const { start, end } = getSeminarTimes(seminar);
 
-      if (seminarDate.getTime() === today.getTime()) {
+      if (start >= today.getTime() && start < tomorrow.getTime()) {
         todayList.push(seminar);
-      } else if (seminarDate.getTime() > today.getTime()) {
+      } else if (start >= tomorrow.getTime()) {
         upcomingList.push(seminar);
       } else {
-        if (seminarDate.getTime() >= thirtyDaysAgo.getTime()) {
+        if (end >= thirtyDaysAgo.getTime()) {
           pastList.push(seminar);
         }
       }
     });
 
     // --- SORTING LOGIC ADDED HERE ---
+    const byStart = (a: Seminar, b: Seminar) => getSortKey(a).localeCompare(getSortKey(b));
 
     // 1. Sort Today's seminars (Earliest time first)
-    todayList.sort((a, b) => new Date(a.date).getTime() - new Date(b.date).getTime());
+    todayList.sort(byStart);
 
     // 2. Sort Upcoming seminars (Soonest date first)
-    upcomingList.sort((a, b) => new Date(a.date).getTime() - new Date(b.date).getTime());
+    upcomingList.sort(byStart);
 
     // 3. Sort Past Seminars (Newest/Most recent first) - Existing logic
-    pastList.sort((a, b) => new Date(b.date).getTime() - new Date(a.date).getTime());
+    pastList.sort((a, b) => byStart(b, a));
 
     return { todaySeminars: todayList, upcomingSeminars: upcomingList, pastSeminars: pastList };
   }, [seminars, searchQuery]);
@@ -57,6 +57,16 @@ export const SeminarCard = ({ seminar }: { seminar: Seminar }) => {
               {seminar.series}
             </span>
           )}
+          {/* Cross-listed: the same talk listed by other departments/series */}
+          {seminar.cross_listed?.map((listing) => (
+            <span
+              key={`${listing.department}|${listing.series}`}
+              title={`Also listed by ${listing.department}`}
+              className="inline-flex items-center px-2.5 py-0.5 rounded-md text-xs font-semibold bg-columbia-turquoise/10 text-columbia-turquoise border border-columbia-turquoise/20"
+            >
+              {listing.series}
+            </span>
+          ))}
         </div>
 
         {/* Title */}
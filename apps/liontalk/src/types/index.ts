@@ -11,6 +11,20 @@ export interface Seminar {
     series: string;
     abstract: string;
     bio: string;
+    // Normalized by the scraper (date_normalizer.py); null when the date couldn't be parsed,
+    // missing in data written before normalization existed
+    date_iso?: string | null;    // local date, "2026-01-26"
+    start_iso?: string | null;   // local start with offset, "2026-01-26T16:10:00-05:00"
+    start_epoch?: number | null; // seconds since the epoch
+    end_epoch?: number | null;
+    sort_key?: string | null;    // UTC start, "2026-01-26T21:10:00Z", sortable as a plain string
+    // Other department/series pairs that list the same talk (it appears in seminars.json only once)
+    cross_listed?: SeriesListing[];
+}
+
+export interface SeriesListing {
+    department: string;
+    series: string;
 }
 
 export interface SeminarSeriesData {
@@ -72,8 +72,23 @@ export const parseSeminarDate = (dateStr: string, timeStr: string) => {
   }
 };
 
-export const getGoogleCalendarLink = (seminar: Seminar) => {
+// Start/end in ms, from the scraper's epochs; only re-parses date/time when they're missing
+export const getSeminarTimes = (seminar: Seminar) => {
+  if (seminar.start_epoch != null && seminar.end_epoch != null) {
+    return { start: seminar.start_epoch * 1000, end: seminar.end_epoch * 1000 };
+  }
   const { startDate, endDate } = parseSeminarDate(seminar.date, seminar.time);
+  return { start: startDate.getTime(), end: endDate.getTime() };
+};
+
+// Same format as the scraper's sort_key (UTC start, "2026-01-26T21:10:00Z"), so the two compare as strings
+export const getSortKey = (seminar: Seminar) =>
+  seminar.sort_key ?? new Date(getSeminarTimes(seminar).start).toISOString().replace(/\.\d{3}Z$/, 'Z');
+
+export const getGoogleCalendarLink = (seminar: Seminar) => {
+  const { start, end } = getSeminarTimes(seminar);
+  const startDate = new Date(start);
+  const endDate = new Date(end);
   const fmt = (d: Date) => d.toISOString().replace(/-|:|\.\d\d\d/g, "");
 
   const params = new URLSearchParams({
@@ -0,0 +1,122 @@
+"""
+Drop-in replacement for google.genai.Client used by the benchmark.
+Answers with entries derived from the input, so the rest of the pipeline (validation, merging) runs for real.
+"""
+
+from bs4 import BeautifulSoup
+from datetime import datetime
+import re, json, time, random, threading
+
+class FakeAPIError(Exception):
+    """
+    Looks enough like google.genai.errors.APIError for rate_limiter.classify_error.
+    """
+
+    def __init__(self, code, message):
+        super().__init__(f"{code} {message}")
+        self.code = code
+
+class FakeUsage:
+    def __init__(self, prompt_token_count, candidates_token_count):
+        self.prompt_token_count = prompt_token_count
+        self.candidates_token_count = candidates_token_count
+
+class FakeResponse:
+    def __init__(self, text, input_tokens):
+        self.text = text
+        self.usage_metadata = FakeUsage(input_tokens, (len(text) + 3) // 4)
+
+class FakeFile:
+    def __init__(self, path):
+        with open(path, encoding="utf-8") as f:
+            self.html = f.read()
+
+DATE_RE = re.compile(r'([A-Z][a-z]+ \d{1,2}, \d{4})')
+
+def _entry_from_lines(title, lines):
+    # Fill what Gemini would: speaker name (before the affiliation) and date, so cross-listed talks can be matched
+    text = "\n".join(lines)
+    speaker = next((line.split(":", 1)[1] for line in lines if line.startswith("Speaker:")), lines[0] if lines else "")
+    speaker = re.split(r'\s*[(,]', speaker.strip(), maxsplit=1)[0]
+    match = DATE_RE.search(text)
+    date = datetime.strptime(match.group(1), "%B %d, %Y").strftime("%-d-%b-%y") if match else ""
+    return {"seminar_title": title, "date": date, "location": "", "time": "",
+            "speaker": speaker, "affiliation": "", "abstract": "", "bio": ""}
+
+def _entries_from_html(html):
+    soup = BeautifulSoup(html, "html.parser")
+    entries = []
+    for title in soup.find_all(["h2", "h3", "h4"]):
+        # An event runs from its heading to the next one
+        lines = []
+        for sibling in title.find_next_siblings():
+            if sibling.name in ("h2", "h3", "h4"):
+                break
+            lines.append(sibling.get_text(" ", strip=True))
+        entries.append(_entry_from_lines(title.get_text(strip=True), lines))
+    return entries
+
+def _entries_from_events(prompt):
+    # The event list is the JSON after the instructions
+    events = json.loads(prompt[prompt.index("\n\n") + 2:])
+    return [
+        {"seminar_title": event.get("title", ""), "date": event.get("date_display", ""), "location": event.get("location", ""),
+         "time": event.get("time_display", ""), "speaker": event.get("speaker", ""), "affiliation": "",
+         "abstract": event.get("abstract", ""), "bio": event.get("speaker_bio", "")}
+        for event in events
+    ]
+
+class _Files:
+    def __init__(self, client):
+        self.client = client
+
+    def upload(self, file):
+        self.client._simulate("upload", self.client.upload_latency)
+        return FakeFile(file)
+
+class _Models:
+    def __init__(self, client):
+        self.client = client
+
+    def generate_content(self, model, contents, config=None):
+        prompt = contents[0]
+        self.client._simulate("generate", self.client.latency)
+        if len(contents) > 1:
+            entries = _entries_from_html(contents[1].html)
+            input_tokens = (len(prompt) + len(contents[1].html)) // 4
+        else:
+            entries = _entries_from_events(prompt)
+            input_tokens = len(prompt) // 4
+        return FakeResponse(json.dumps({"entries": entries}), input_tokens)
+
+class FakeGeminiClient:
+    """
+    `latency` seconds (+/- `jitter`) per generate_content call, `upload_latency` per file upload.
+    `error_rate` of calls raise a retryable 503/429, `error_429_share` of which are 429s.
+    """
+
+    def __init__(self, latency=0.8, jitter=0.3, upload_latency=0.2, error_rate=0.0, error_429_share=0.5, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.upload_latency = upload_latency
+        self.error_rate = error_rate
+        self.error_429_share = error_429_share
+        self.random = random.Random(seed)
+        self.files = _Files(self)
+        self.models = _Models(self)
+        self.calls = {"upload": 0, "generate": 0, "errors": 0}
+        self._lock = threading.Lock()
+
+    def _simulate(self, kind, latency):
+        with self._lock:
+            self.calls[kind] += 1
+            delay = max(0.0, latency + self.random.uniform(-self.jitter, self.jitter))
+            fail = self.random.random() < self.error_rate
+            throttled = self.random.random() < self.error_429_share
+            if fail:
+                self.calls["errors"] += 1
+        time.sleep(delay)
+        if fail:
+            if throttled:
+                raise FakeAPIError(429, "RESOURCE_EXHAUSTED. Please retry in 1s.")
+            raise FakeAPIError(503, "UNAVAILABLE. The model is overloaded.")
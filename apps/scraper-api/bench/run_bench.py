@@ -0,0 +1,181 @@
+"""
+Offline benchmark: runs the real scraper against a local fixture site and a fake Gemini backend.
+
+    python bench/run_bench.py --rows 4 --events 10 --gemini-latency 0.8 --error-rate 0.1
+
+Scraper settings (MAX_CONCURRENCY, RULES, INCREMENTAL, TOKEN_BUDGET...) are read from the environment as usual.
+"""
+
+from pathlib import Path
+import os, sys, json, math, time, asyncio, argparse, resource, tempfile
+
+BENCH_DIR = Path(__file__).resolve().parent
+SRC_DIR = BENCH_DIR.parent / "src"
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the scraper offline.")
+    parser.add_argument("--rows", type=int, default=4, help="input.csv rows per scrape method")
+    parser.add_argument("--events", type=int, default=10, help="events on every fixture page")
+    parser.add_argument("--site-latency", type=float, default=0.05, help="seconds added to every fixture response")
+    parser.add_argument("--render-delay", type=int, default=200, help="ms before the method 3 SPA renders its events")
+    parser.add_argument("--gemini-latency", type=float, default=0.8, help="seconds per fake generate_content call")
+    parser.add_argument("--gemini-jitter", type=float, default=0.3)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of fake Gemini calls that fail with 429/503")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--report", type=Path, default=None, help="write the report as JSON here")
+    parser.add_argument("--baseline", type=Path, default=None, help="compare against an earlier --report")
+    parser.add_argument("--max-regression", type=float, default=None,
+                        help="exit non-zero if rows/sec drops by more than this fraction vs --baseline (e.g. 0.2)")
+    return parser.parse_args()
+
+def configure_environment(work_dir):
+    """
+    Keep every file the scraper writes inside work_dir, and don't let the real cache or limits skew results.
+    Anything already set in the environment wins.
+    """
+    os.environ.setdefault("STATE_DIR", str(work_dir / "state"))
+    os.environ.setdefault("METRICS_DIR", str(work_dir / "metrics"))
+    os.environ.setdefault("OUTPUT_DIR", str(work_dir / "data"))
+    os.environ.setdefault("LLM_CACHE", "false")
+    os.environ.setdefault("LLM_CACHE_DIR", str(work_dir / ".llm_cache"))
+    os.environ.setdefault("PRECHECK", "false")
+    # Every fixture row lives on 127.0.0.1, so the per-host limit would otherwise serialize them
+    os.environ.setdefault("MAX_PER_HOST", os.getenv("MAX_CONCURRENCY", "8"))
+    os.environ.setdefault("GEMINI_RPM", "100000")
+    os.environ.setdefault("GEMINI_TPM", "100000000")
+    os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+def build_input(base_url, rows):
+    import pandas as pd
+
+    records = []
+    for number in range(rows):
+        records.append({"department": "Bench", "series": f"Stat Series {number}", "website": f"{base_url}/stat/series-{number}/", "scrape_method": 1})
+        records.append({"department": "Bench", "series": f"Drupal Series {number}", "website": f"{base_url}/drupal/series-{number}/events", "scrape_method": 2})
+        records.append({"department": "Bench", "series": f"SPA Series {number}", "website": f"{base_url}/spa/series-{number}/", "scrape_method": 3})
+    return pd.DataFrame.from_records(records)
+
+def percentile(values, fraction):
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not values:
+        return 0.0
+    rank = max(0, min(len(values) - 1, math.ceil(fraction * len(values)) - 1))
+    return values[rank]
+
+def stage_latencies(records):
+    durations = {}
+    for record in records:
+        if record["type"] == "span":
+            durations.setdefault(record["stage"], []).append(record["duration_ms"])
+
+    stages = {}
+    for stage, values in sorted(durations.items()):
+        values.sort()
+        stages[stage] = {
+            "count": len(values),
+            "p50_ms": percentile(values, 0.50),
+            "p99_ms": percentile(values, 0.99),
+            "total_s": round(sum(values) / 1000, 3),
+        }
+    return stages
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux; children covers the Playwright driver (and the Chromium processes it reaped)
+    return {
+        "python": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "children": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1),
+    }
+
+def print_report(report, baseline=None):
+    print()
+    print(f"Rows: {report['rows_ok']}/{report['rows']} ok, {report['events']} events in {report['wall_seconds']}s")
+    print(f"Throughput: {report['rows_per_sec']} rows/s, {report['events_per_sec']} events/s")
+    print(f"Peak RSS: python {report['peak_rss_mb']['python']} MB, largest child {report['peak_rss_mb']['children']} MB")
+    print(f"Fake Gemini calls: {report['gemini_calls']}, fixture requests: {report['site_requests']}")
+    print()
+    print(f"{'stage':<20}{'count':>8}{'p50 ms':>12}{'p99 ms':>12}{'total s':>10}" + ("   p50 vs baseline" if baseline else ""))
+    for stage, stat in report["stages"].items():
+        line = f"{stage:<20}{stat['count']:>8}{stat['p50_ms']:>12.1f}{stat['p99_ms']:>12.1f}{stat['total_s']:>10.2f}"
+        before = baseline["stages"].get(stage) if baseline else None
+        if before and before["p50_ms"]:
+            line += f"   {(stat['p50_ms'] - before['p50_ms']) / before['p50_ms']:+.0%}"
+        print(line)
+
+    if baseline:
+        change = (report["rows_per_sec"] - baseline["rows_per_sec"]) / baseline["rows_per_sec"] if baseline["rows_per_sec"] else 0.0
+        print(f"\nrows/s vs baseline: {baseline['rows_per_sec']} -> {report['rows_per_sec']} ({change:+.0%})")
+        return change
+    return None
+
+def main():
+    args = parse_args()
+    # Resolve before changing into the work dir
+    args.report = args.report.resolve() if args.report else None
+    args.baseline = args.baseline.resolve() if args.baseline else None
+    work_dir = Path(tempfile.mkdtemp(prefix="scraper-bench-"))
+    configure_environment(work_dir)
+
+    sys.path.insert(0, str(SRC_DIR))
+    sys.path.insert(0, str(BENCH_DIR))
+    # Relative scratch paths (sources/) land in the work dir too
+    os.chdir(work_dir)
+
+    import scraper
+    from metrics import tracer
+    from site_server import SiteServer
+    from fake_gemini import FakeGeminiClient
+
+    site = SiteServer(events_per_page=args.events, latency=args.site_latency, render_delay_ms=args.render_delay).start()
+    client = FakeGeminiClient(latency=args.gemini_latency, jitter=args.gemini_jitter, error_rate=args.error_rate, seed=args.seed)
+    scraper._gemini_client = client
+
+    df = build_input(site.base_url, args.rows)
+    print(f"Benchmarking {len(df)} rows against {site.base_url} (work dir {work_dir})")
+
+    started = time.perf_counter()
+    try:
+        results = asyncio.run(scraper.scrape_all(df))
+        scraper.output_writer.write_combined(results)
+        scraper.output_writer.write_manifest(tracer.run_id)
+        if scraper.JOURNAL:
+            scraper.journal.finish()
+    finally:
+        site.stop()
+    wall = time.perf_counter() - started
+
+    events = sum(len(seminar.entries) for seminar in results)
+    report = {
+        "config": {**vars(args), "report": None, "baseline": None},
+        "rows": len(df),
+        "rows_ok": len(results),
+        "events": events,
+        "wall_seconds": round(wall, 3),
+        "rows_per_sec": round(len(df) / wall, 3),
+        "events_per_sec": round(events / wall, 3),
+        "stages": stage_latencies(tracer.records),
+        "peak_rss_mb": peak_rss_mb(),
+        "gemini_calls": client.calls,
+        "site_requests": site.requests,
+        "limiter": scraper.gemini_limiter.stats(),
+    }
+    tracer.export(os.environ["METRICS_DIR"])
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else None
+    change = print_report(report, baseline)
+
+    if args.report:
+        args.report.parent.mkdir(parents=True, exist_ok=True)
+        args.report.write_text(json.dumps(report, indent=2, default=str))
+        print(f"Report written to {args.report}")
+
+    if report["rows_ok"] < report["rows"]:
+        print("ERROR: some rows failed")
+        sys.exit(1)
+    if change is not None and args.max_regression is not None and change < -args.max_regression:
+        print(f"ERROR: rows/s regressed by more than {args.max_regression:.0%}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
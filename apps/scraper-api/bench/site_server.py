@@ -0,0 +1,152 @@
+"""
+Local stand-in for the seminar sites, one page shape per scrape_method:
+
+    /stat/<series>/          scrape_1  stat.columbia.edu  (#seminar-content with labelled blocks)
+    /drupal/<series>/events  scrape_2  Drupal calendar    (div.view-content > article.cu-event)
+    /drupal/<series>/event/N scrape_2  Drupal detail page (field--name-* divs)
+    /spa/<series>/           scrape_3  seminars.app SPA   (section#events filled in by JS)
+"""
+
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse
+from datetime import datetime, timedelta, timezone
+import json, threading, time, random
+
+SPEAKERS = ["Yuetian Luo", "Weng Kee Wong", "Daniel Sanz-Alonso", "Rina Foygel Barber", "Anru Zhang", "Jane Doe"]
+SCHOOLS = ["Rutgers University", "UCLA", "University of Chicago", "Columbia University", "MIT", "Stanford University"]
+ABSTRACT = (
+    "Algorithmic stability is a central concept in statistics and learning theory that measures how sensitive "
+    "an algorithm's output is to small changes in the training data. In this talk, we consider two different "
+    "perspectives of algorithmic stability in statistical inference. "
+)
+BIO = "An assistant professor whose research interests lie broadly in distribution-free inference and robust statistics. "
+
+def _event(number):
+    start = datetime.now(timezone(timedelta(hours=-5))).replace(hour=16, minute=10, second=0, microsecond=0) + timedelta(days=1 + number % 13)
+    return {
+        "title": f"Benchmark Seminar {number}: Stability in Statistical Inference",
+        "speaker": SPEAKERS[number % len(SPEAKERS)],
+        "affiliation": SCHOOLS[number % len(SCHOOLS)],
+        "start": start,
+        "abstract": ABSTRACT * 3,
+        "bio": BIO * 2,
+    }
+
+def _noise():
+    # Real pages ship a lot of markup the scraper has to wade through
+    return (
+        "<nav class='site-nav'>" + "".join(f"<a class='nav-link' href='/x/{i}'>Link {i}</a>" for i in range(40)) + "</nav>"
+        "<script>window.dataLayer = window.dataLayer || []; function gtag(){dataLayer.push(arguments);}</script>"
+        "<style>.site-nav{display:flex}.nav-link{padding:4px}</style>"
+    )
+
+def stat_page(events):
+    blocks = []
+    for number in range(events):
+        event = _event(number)
+        blocks.append(
+            f"<h3>{event['title']}</h3>"
+            f"<p><strong>Speaker:</strong> {event['speaker']} ({event['affiliation']})</p>"
+            f"<p><strong>Date:</strong> {event['start'].strftime('%A, %B %d, %Y')}</p>"
+            f"<p><strong>Time:</strong> 4:10 pm - 5:00 pm</p>"
+            f"<p><strong>Location:</strong> Room 903 SSW, 1255 Amsterdam Avenue</p>"
+            f"<p><strong>Abstract:</strong> {event['abstract']}</p>"
+            f"<p><strong>Bio:</strong> {event['bio']}</p>"
+        )
+    return f"<html><head><title>Seminars</title></head><body>{_noise()}<div id='seminar-content'>{''.join(blocks)}</div></body></html>"
+
+def drupal_listing(series, events):
+    articles = []
+    for number in range(events):
+        event = _event(number)
+        articles.append(
+            f"<article class='cu-event node--view-mode-teaser'>"
+            f"<div class='event-time' data-start-time='{int(event['start'].timestamp())}'>{event['start'].strftime('%b %d')}</div>"
+            f"<a href='/drupal/{series}/event/{number}'><span class='field--name-title'>{event['title']}</span></a>"
+            f"</article>"
+        )
+    return f"<html><body>{_noise()}<div class='view-content'>{''.join(articles)}</div></body></html>"
+
+def drupal_detail(number):
+    event = _event(number)
+    return (
+        f"<html><body>{_noise()}<div class='region-content'>"
+        f"<div class='field--name-field-event-location'>Room 903 SSW, 1255 Amsterdam Avenue</div>"
+        f"<div class='field--name-field-speaker'>{event['speaker']}, {event['affiliation']}</div>"
+        f"<div class='field--name-body'><p>{event['abstract']}</p><p>About the speaker</p><p>{event['bio']}</p></div>"
+        f"</div></body></html>"
+    )
+
+def spa_page(events, render_delay_ms):
+    cards = "".join(
+        f"<article class=\"seminar-event\"><h3>{event['title']}</h3><p class=\"speaker\">{event['speaker']}, {event['affiliation']}</p>"
+        f"<time>{event['start'].strftime('%B %d, %Y')} 4:10 pm - 5:00 pm</time><p class=\"room\">IAB 1101</p><p>{event['abstract']}</p></article>"
+        for event in (_event(number) for number in range(events))
+    )
+    # Cards only exist after the "app" renders, like the real single-page app
+    return (
+        f"<html><body>{_noise()}<section id='events'></section>"
+        f"<script>setTimeout(function(){{document.getElementById('events').innerHTML = {json.dumps(cards)};}}, {render_delay_ms});</script>"
+        f"</body></html>"
+    )
+
+class SiteServer:
+    """
+    Serves the fixture pages on 127.0.0.1 from a background thread.
+    `latency` (seconds, +/- `jitter`) is added to every response to mimic a real server.
+    """
+
+    def __init__(self, events_per_page=10, latency=0.05, jitter=0.02, render_delay_ms=200):
+        self.events_per_page = events_per_page
+        self.latency = latency
+        self.jitter = jitter
+        self.render_delay_ms = render_delay_ms
+        self.requests = 0
+        self._server = None
+
+    def _route(self, path):
+        parts = [part for part in urlparse(path).path.split("/") if part]
+        if len(parts) >= 2 and parts[0] == "stat":
+            return stat_page(self.events_per_page)
+        if len(parts) >= 3 and parts[0] == "drupal" and parts[2] == "events":
+            return drupal_listing(parts[1], self.events_per_page)
+        if len(parts) >= 4 and parts[0] == "drupal" and parts[2] == "event":
+            return drupal_detail(int(parts[3]))
+        if len(parts) >= 2 and parts[0] == "spa":
+            return spa_page(self.events_per_page, self.render_delay_ms)
+        return None
+
+    def start(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                site.requests += 1
+                time.sleep(max(0.0, site.latency + random.uniform(-site.jitter, site.jitter)))
+                body = site._route(self.path)
+                if body is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                payload = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
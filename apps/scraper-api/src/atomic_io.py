@@ -0,0 +1,25 @@
+from pathlib import Path
+import os, tempfile
+
+# Temp files are named <random>.tmp next to their target; anything this old was left by a killed process
+STALE_TMP_SECONDS = 60 * 60
+
+def atomic_write(path, text):
+    """
+    Write to a temp file in the same directory, fsync, then rename over `path`.
+    Readers see either the old file or the new one, never a partial write.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+            # mkstemp creates the file owner-only; published files must stay readable for the site and CI
+            os.fchmod(f.fileno(), 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
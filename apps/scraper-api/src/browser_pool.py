@@ -0,0 +1,190 @@
+from playwright.async_api import async_playwright
+from contextlib import asynccontextmanager
+import os, asyncio
+
+from metrics import tracer
+
+# Use a real browser Context + User Agent to avoid bot detection
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+class BrowserPool:
+    """
+    One long-lived Chromium shared by every scrape method.
+
+    Pages are borrowed with `async with pool.page() as page:` and handed back warm (context + page kept open)
+    so the next scrape skips Chromium startup and context creation. The browser is recycled after
+    `max_uses` borrows, or relaunched if it crashed/disconnected.
+    """
+
+    def __init__(self, max_uses=None, max_idle=None, headless=None):
+        self.max_uses = max_uses or int(os.getenv("BROWSER_MAX_USES", "50"))
+        self.max_idle = max_idle or int(os.getenv("BROWSER_MAX_IDLE", "8"))
+        if headless is None:
+            headless = os.getenv("HEADLESS", "true").lower() == "true"
+        self.headless = headless
+
+        self._playwright = None
+        self._browser = None
+        self._uses = 0            # Borrows served by the current browser
+        self._borrowed = {}       # browser -> pages currently lent out
+        self._idle = []           # (browser, context, page) ready for reuse
+        self._lock = asyncio.Lock()
+
+        self.launches = 0
+        self.recycles = 0
+        self.crashes = 0
+        self.borrows = 0
+        self.reuses = 0
+        self.discarded = 0
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def start(self):
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+
+    async def close(self):
+        async with self._lock:
+            for browser, context, page in self._idle:
+                await self._safe_close(context)
+            self._idle.clear()
+            for browser in list(self._borrowed) + [self._browser]:
+                if browser is not None:
+                    await self._safe_close(browser)
+            self._borrowed.clear()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    def stats(self):
+        return {
+            "launches": self.launches,
+            "recycles": self.recycles,
+            "crashes": self.crashes,
+            "borrows": self.borrows,
+            "reuses": self.reuses,
+            "discarded": self.discarded,
+            "idle_pages": len(self._idle),
+            "in_use_pages": sum(self._borrowed.values()),
+            "current_browser_uses": self._uses,
+        }
+
+    @asynccontextmanager
+    async def page(self, policy=None):
+        """
+        Borrow a page, optionally with a NetworkPolicy's request filtering applied. It goes back to the pool
+        if the caller finished cleanly, otherwise its context is thrown away so a broken page is never reused.
+        """
+        browser, context, page = await self._acquire()
+        healthy = False
+        try:
+            if policy is not None:
+                await policy.apply(page)
+            yield page
+            healthy = True
+        finally:
+            await self._release(browser, context, page, healthy)
+
+    async def _acquire(self):
+        async with self._lock:
+            await self.start()
+            self.borrows += 1
+
+            # Relaunch if the browser died underneath us
+            if self._browser is not None and not self._browser.is_connected():
+                print("Browser pool: browser disconnected, relaunching...")
+                self.crashes += 1
+                await self._retire_browser()
+
+            # Recycle after N uses to keep Chromium memory in check
+            if self._browser is not None and self._uses >= self.max_uses:
+                print(f"Browser pool: recycling browser after {self._uses} uses...")
+                self.recycles += 1
+                await self._retire_browser()
+
+            if self._browser is None:
+                with tracer.span("browser_launch"):
+                    self._browser = await self._playwright.chromium.launch(headless=self.headless)
+                self._borrowed[self._browser] = 0
+                self._uses = 0
+                self.launches += 1
+
+            browser = self._browser
+            self._uses += 1
+            self._borrowed[browser] += 1
+
+            # Reuse a warm page from the current browser if we have one
+            while self._idle:
+                idle_browser, context, page = self._idle.pop()
+                if idle_browser is browser and not page.is_closed():
+                    self.reuses += 1
+                    return browser, context, page
+                await self._safe_close(context)
+
+        try:
+            with tracer.span("context_create"):
+                context = await browser.new_context(user_agent=USER_AGENT)
+                page = await context.new_page()
+        except Exception:
+            async with self._lock:
+                self._borrowed[browser] -= 1
+            raise
+        return browser, context, page
+
+    async def _release(self, browser, context, page, healthy):
+        async with self._lock:
+            self._borrowed[browser] -= 1
+            reusable = (
+                healthy
+                and browser is self._browser
+                and browser.is_connected()
+                and not page.is_closed()
+                and len(self._idle) < self.max_idle
+            )
+
+        if reusable:
+            try:
+                # Drop the previous source's request filters and DOM so idle pages start clean
+                await page.unroute_all(behavior="ignoreErrors")
+                await page.goto("about:blank")
+            except Exception:
+                reusable = False
+
+        async with self._lock:
+            if reusable and browser is self._browser and len(self._idle) < self.max_idle:
+                self._idle.append((browser, context, page))
+            else:
+                self.discarded += 1
+                await self._safe_close(context)
+
+            # A retired browser is closed once its last page comes back
+            if browser is not self._browser and self._borrowed.get(browser) == 0:
+                del self._borrowed[browser]
+                await self._safe_close(browser)
+
+    async def _retire_browser(self):
+        old = self._browser
+        self._browser = None
+        self._uses = 0
+
+        for entry in [e for e in self._idle if e[0] is old]:
+            self._idle.remove(entry)
+            await self._safe_close(entry[1])
+
+        # Close now if nothing is borrowed, otherwise _release closes it later
+        if self._borrowed.get(old) == 0:
+            del self._borrowed[old]
+            await self._safe_close(old)
+
+    @staticmethod
+    async def _safe_close(target):
+        try:
+            await target.close()
+        except Exception:
+            pass
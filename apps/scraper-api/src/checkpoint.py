@@ -0,0 +1,197 @@
+from datetime import datetime, timezone
+from pathlib import Path
+import os, json, hashlib, threading
+
+# An unfinished journal older than this is abandoned instead of resumed, so a run that died days ago
+# doesn't hand stale rows and Gemini results to today's run
+JOURNAL_MAX_AGE_HOURS = float(os.getenv("JOURNAL_MAX_AGE_HOURS", "24"))
+
+def input_hash(df):
+    """
+    SHA-256 of the input.csv rows. A run can only be resumed against the same input.
+    """
+    return hashlib.sha256(df.to_csv(index=False).encode("utf-8")).hexdigest()
+
+def row_key(index, row):
+    """
+    Identifies one input.csv row (position plus everything that decides what gets scraped).
+    """
+    text = json.dumps([int(index), str(row['department']), str(row['series']), str(row['website']).strip(), str(row['scrape_method'])])
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+class RunJournal:
+    """
+    Append-only JSON-lines journal of one run, at <directory>/<input hash>.jsonl:
+
+        {"type": "start", "run_id": ..., "input_hash": ..., "rows": ...}
+        {"type": "extraction", "key": <llm cache key>, "result": <SeminarHalfBaked JSON>}
+        {"type": "row", "row": 3, "key": <row_key>, "seminar": <SeminarFullyBaked dict>}
+        {"type": "finish", "run_id": ...}
+
+    Every record is flushed and fsynced before the call returns, so a killed process loses at most the
+    line it was writing (a torn last line is dropped on read). If the journal for the same input hash
+    has no "finish" record and was started less than `max_age_hours` ago, the next run resumes it under
+    the same run ID: finished rows are reused and
+    journaled Gemini results are served without a new call. The journal also holds everything needed to
+    rebuild the output files offline (see `replay`).
+    """
+
+    def __init__(self, directory, max_age_hours=JOURNAL_MAX_AGE_HOURS):
+        self.directory = Path(directory)
+        self.max_age_hours = max_age_hours
+        self.path = None
+        self.run_id = None
+        self.resumed = False
+        self.rows = {}
+        self.extractions = {}
+        self._file = None
+        self._lock = threading.Lock()
+        self.metrics = {"rows_reused": 0, "extractions_reused": 0, "records": 0}
+
+    def path_for(self, input_hash):
+        return self.directory / f"{input_hash[:16]}.jsonl"
+
+    @staticmethod
+    def read(path):
+        """
+        Returns (records, bytes of intact records). Reading stops at the first torn or corrupt line.
+        """
+        records, intact = [], 0
+        with open(path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    print(f"Dropping torn last record in journal {path}")
+                    break
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    print(f"Dropping corrupt record (and everything after it) in journal {path}")
+                    break
+                intact += len(line)
+        return records, intact
+
+    @staticmethod
+    def age_hours(record):
+        """
+        Hours since a record was written, or None if it has no readable timestamp.
+        """
+        try:
+            written = datetime.fromisoformat(record["ts"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        return (datetime.now(timezone.utc) - written).total_seconds() / 3600
+
+    def start(self, input_hash, run_id, rows=None):
+        """
+        Resume the unfinished journal for this input, or start a new one under `run_id`.
+        Returns the run ID in effect.
+        """
+        self.close()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.path = self.path_for(input_hash)
+        records, intact = self.read(self.path) if self.path.exists() else ([], 0)
+
+        resumable = (
+            records
+            and records[0].get("type") == "start"
+            and records[0].get("input_hash") == input_hash
+            and not any(record.get("type") == "finish" for record in records)
+        )
+        if resumable:
+            age = self.age_hours(records[0])
+            if age is None or age > self.max_age_hours:
+                print(f"Not resuming journal {self.path}: started {'at an unknown time' if age is None else f'{age:.1f}h ago'}, limit {self.max_age_hours:g}h")
+                resumable = False
+        self.rows, self.extractions = {}, {}
+        if resumable:
+            self.resumed = True
+            self.run_id = records[0]["run_id"]
+            for record in records:
+                if record.get("type") == "row":
+                    self.rows[record["key"]] = record["seminar"]
+                elif record.get("type") == "extraction":
+                    self.extractions[record["key"]] = record["result"]
+            # Cut off a torn tail so the next append starts on a fresh line
+            with open(self.path, "r+b") as f:
+                f.truncate(intact)
+            self._file = open(self.path, "a", encoding="utf-8")
+            print(f"Resuming run {self.run_id}: {len(self.rows)} rows and {len(self.extractions)} extractions already journaled in {self.path}")
+        else:
+            self.resumed = False
+            self.run_id = run_id
+            self._file = open(self.path, "w", encoding="utf-8")
+            self._append({"type": "start", "run_id": run_id, "input_hash": input_hash, "rows": rows})
+        return self.run_id
+
+    def _append(self, record):
+        record = {**record, "ts": datetime.now(timezone.utc).isoformat()}
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.metrics["records"] += 1
+
+    def row_result(self, key):
+        """
+        The journaled SeminarFullyBaked dict for a finished row, or None.
+        """
+        seminar = self.rows.get(key)
+        if seminar is not None:
+            self.metrics["rows_reused"] += 1
+        return seminar
+
+    def record_row(self, key, index, seminar):
+        # Nothing is remembered unless a run was started (the daemon never starts one)
+        if self._file is None:
+            return
+        self.rows[key] = seminar
+        self._append({"type": "row", "row": int(index), "key": key, "seminar": seminar})
+
+    def extraction(self, key):
+        """
+        The journaled SeminarHalfBaked JSON for an LLM cache key, or None.
+        """
+        with self._lock:
+            result = self.extractions.get(key)
+            if result is not None:
+                self.metrics["extractions_reused"] += 1
+        return result
+
+    def record_extraction(self, key, result):
+        if self._file is None:
+            return
+        with self._lock:
+            self.extractions[key] = result
+        self._append({"type": "extraction", "key": key, "result": result})
+
+    def finish(self):
+        """
+        Mark the run complete once its output is written, so the next run starts fresh.
+        """
+        self._append({"type": "finish", "run_id": self.run_id})
+        self.close()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    @classmethod
+    def replay(cls, path):
+        """
+        (run_id, SeminarFullyBaked dicts in input.csv order) from a journal file. Needs no network.
+        """
+        records, _ = cls.read(path)
+        run_id = next((record["run_id"] for record in records if record.get("type") == "start"), None)
+        rows = {}
+        for record in records:
+            if record.get("type") == "row":
+                rows[record["row"]] = record["seminar"]
+        return run_id, [rows[index] for index in sorted(rows)]
+
+    def stats(self):
+        return {"run_id": self.run_id, "resumed": self.resumed, **self.metrics}
@@ -0,0 +1,267 @@
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+import os, json, time, random, signal, asyncio, threading
+import pandas as pd
+
+import scraper
+from metrics import tracer
+from parse_pipeline import ParsePipeline
+from date_normalizer import normalize_groups
+
+# --- DAEMON SETTINGS ---
+# Status API; bind 0.0.0.0 (and publish the port) to reach it from outside a container
+DAEMON_HOST = os.getenv("DAEMON_HOST", "127.0.0.1")
+DAEMON_PORT = int(os.getenv("DAEMON_PORT", "8080"))
+# Default refresh interval per source; input.csv `refresh_minutes` / `priority` columns override it per row
+REFRESH_MINUTES = float(os.getenv("REFRESH_MINUTES", "360"))
+# Sources with a talk coming up refresh more often, but never more often than this (also the first retry delay)
+MIN_REFRESH_MINUTES = float(os.getenv("MIN_REFRESH_MINUTES", "30"))
+# +/- share of each interval, so sources added together don't stay in lockstep
+REFRESH_JITTER = float(os.getenv("REFRESH_JITTER", "0.1"))
+
+def _column(row, name, default):
+    value = row.get(name)
+    return default if value is None or pd.isna(value) or str(value).strip() == "" else value
+
+def _iso(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat() if timestamp else None
+
+class Source:
+    """
+    Schedule, freshness and latest result of one input.csv row.
+    """
+
+    def __init__(self, index, row):
+        self.index = index
+        self.row = row
+        self.interval = float(_column(row, "refresh_minutes", REFRESH_MINUTES)) * 60
+        self.priority = int(_column(row, "priority", 0))
+        self.next_due = time.time() # Everything refreshes once at startup
+        self.last_attempt = None
+        self.last_success = None
+        self.failures = 0
+        self.last_error = None
+        self.seminar = None
+        self.next_talk = None
+
+    def record(self, seminar, now):
+        self.last_attempt = now
+        if seminar is None:
+            # The scrape failed. Keep serving the last good result; retry sooner than the full interval
+            self.failures += 1
+            self.last_error = "no result (see scraper log)"
+        else:
+            self.failures = 0
+            self.last_error = None
+            # An empty result (no talks in the window, e.g. between terms) is still a success
+            self.last_success = now
+            self.seminar = seminar
+            entries = normalize_groups([seminar.model_dump()])[0]["entries"]
+            upcoming = [entry["start_epoch"] for entry in entries if entry["start_epoch"] and entry["start_epoch"] > now]
+            self.next_talk = min(upcoming) if upcoming else None
+        self.reschedule(now)
+
+    def reschedule(self, now):
+        minimum = MIN_REFRESH_MINUTES * 60
+        if self.failures:
+            # Exponential backoff, capped at the normal interval
+            delay = min(self.interval, minimum * 2 ** (self.failures - 1))
+        else:
+            delay = self.interval
+            if self.next_talk:
+                # A quarter of the time left before the next talk, so last-minute changes are picked up
+                delay = max(minimum, min(delay, (self.next_talk - now) / 4))
+        self.next_due = now + delay * (1 + random.uniform(-REFRESH_JITTER, REFRESH_JITTER))
+
+    def freshness(self, now):
+        age = now - self.last_success if self.last_success else None
+        return {
+            "row": int(self.index),
+            "department": self.row['department'],
+            "series": self.row['series'],
+            "website": self.row['website'].strip(),
+            "priority": self.priority,
+            "interval_seconds": round(self.interval),
+            "last_attempt": _iso(self.last_attempt),
+            "last_success": _iso(self.last_success),
+            "age_seconds": round(age) if age is not None else None,
+            "next_due": _iso(self.next_due),
+            "next_talk": _iso(self.next_talk),
+            "entries": len(self.seminar.entries) if self.seminar else 0,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "stale": age is None or age > 2 * self.interval,
+        }
+
+class ScraperDaemon:
+    """
+    Long-running scraper: one warm browser pool, parse pool and Gemini client for the life of the
+    process, and a per-source scheduler instead of re-scraping every row on every run.
+
+    Due sources are refreshed together (highest priority first when they compete for MAX_CONCURRENCY),
+    then the combined output, manifest, state and metrics are written, and the loop sleeps until the
+    next source is due.
+    """
+
+    def __init__(self, df):
+        self.sources = [Source(index, row) for index, row in df.iterrows()]
+        self.started = time.time()
+        self.refreshes = 0
+        self.last_refresh = None
+        self._lock = threading.Lock()
+        self._stop = None
+        self._pool = None
+        self._pipeline = None
+        combined = scraper.OUTPUT_DIR / "seminars.json"
+        # Serve the previous output until the first refresh finishes
+        self._seminars_json = combined.read_bytes() if combined.exists() else b"[]"
+
+    async def run(self, host=DAEMON_HOST, port=DAEMON_PORT):
+        self._stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, self._stop.set)
+
+        limit = asyncio.Semaphore(scraper.MAX_CONCURRENCY)
+        host_limits = {}
+        async with ParsePipeline() as pipeline, scraper.BrowserPool() as pool:
+            self._pool, self._pipeline = pool, pipeline
+            # Started once the parse workers are up, like every other thread in the process
+            server = StatusServer(self, host, port).start()
+            try:
+                await self._loop(pool, pipeline, limit, host_limits)
+            finally:
+                server.stop()
+        print("Daemon stopped")
+
+    async def _loop(self, pool, pipeline, limit, host_limits):
+        while not self._stop.is_set():
+            now = time.time()
+            due = sorted((source for source in self.sources if source.next_due <= now), key=lambda source: (-source.priority, source.next_due))
+            if due:
+                await self.refresh(due, pool, pipeline, limit, host_limits)
+                continue
+
+            # Sleep until the next source is due (re-checked at least every minute), or until stopped
+            wait = min((source.next_due for source in self.sources), default=now + 60) - now
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=min(max(wait, 0), 60))
+            except asyncio.TimeoutError:
+                pass
+
+    async def refresh(self, due, pool, pipeline, limit, host_limits):
+        print(f"Refreshing {len(due)} of {len(self.sources)} source(s): {', '.join(source.row['series'] for source in due)}")
+        scraper.dedup_index.clear()
+        # Tasks are created in priority order, and the concurrency semaphore serves waiters first come first served
+        results = await asyncio.gather(*(scraper.scrape_row(source.index, source.row, pool, pipeline, limit, host_limits) for source in due))
+
+        now = time.time()
+        with self._lock:
+            for source, seminar in zip(due, results):
+                source.record(seminar, now)
+            seminars = [source.seminar for source in self.sources if source.seminar and source.seminar.entries]
+
+        output_path = scraper.output_writer.write_combined(seminars)
+        scraper.output_writer.retain(seminars)
+        scraper.output_writer.write_manifest(tracer.run_id)
+        with self._lock:
+            self._seminars_json = output_path.read_bytes()
+            self.refreshes += 1
+            self.last_refresh = now
+
+        await asyncio.to_thread(scraper.llm_cache.evict)
+        if scraper.PRECHECK:
+            scraper.source_state.save()
+        if scraper.INCREMENTAL:
+            scraper.event_index.save()
+        # One metrics run per refresh, so memory doesn't grow with uptime
+        tracer.export(scraper.METRICS_DIR)
+        tracer.reset()
+        print(f"Refresh done: {sum(result is not None for result in results)} of {len(due)} ok, {len(seminars)} series served")
+
+    def seminars_json(self):
+        with self._lock:
+            return self._seminars_json
+
+    def sources_status(self):
+        now = time.time()
+        with self._lock:
+            return [source.freshness(now) for source in self.sources]
+
+    def health(self):
+        sources = self.sources_status()
+        failing = sum(1 for source in sources if source["failures"])
+        stale = sum(1 for source in sources if source["stale"])
+        return {
+            "status": "ok" if not failing and not stale else "degraded",
+            "uptime_seconds": round(time.time() - self.started),
+            "refreshes": self.refreshes,
+            "last_refresh": _iso(self.last_refresh),
+            "sources": len(sources),
+            "failing": failing,
+            "stale": stale,
+            "browser_pool": self._pool.stats() if self._pool else None,
+            "parse_pipeline": self._pipeline.stats() if self._pipeline else None,
+            "gemini": scraper.gemini_limiter.stats(),
+        }
+
+class StatusServer:
+    """
+    Read-only HTTP API on a background thread:
+
+        GET /seminars   latest merged results (same as seminars.json)
+        GET /sources    per-source freshness, schedule and errors
+        GET /health     overall status; 503 while any source is failing or stale
+    """
+
+    def __init__(self, daemon, host=DAEMON_HOST, port=DAEMON_PORT):
+        self.daemon = daemon
+        self.host = host
+        self.port = port
+        self._server = None
+
+    def start(self):
+        daemon = self.daemon
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = urlparse(self.path).path.rstrip("/")
+                status = 200
+                if path == "/seminars":
+                    payload = daemon.seminars_json()
+                elif path == "/sources":
+                    payload = json.dumps(daemon.sources_status(), indent=2).encode("utf-8")
+                elif path == "/health":
+                    health = daemon.health()
+                    status = 200 if health["status"] == "ok" else 503
+                    payload = json.dumps(health, indent=2).encode("utf-8")
+                else:
+                    status, payload = 404, b'{"error": "not found"}'
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        print(f"Status API listening on http://{self.host}:{self._server.server_port}")
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+def main():
+    script_dir = os.path.dirname(__file__)
+    df = pd.read_csv(os.path.join(script_dir, 'input.csv'))
+
+    asyncio.run(ScraperDaemon(df).run())
+
+if __name__ == "__main__":
+    main()
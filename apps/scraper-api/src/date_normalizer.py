@@ -0,0 +1,134 @@
+import os, re, time
+import numpy as np
+import pandas as pd
+
+# Columbia seminars are all in New York
+SEMINAR_TZ = os.getenv("SEMINAR_TZ", "America/New_York")
+
+# Output window around "now": entries that ended more than PAST_DAYS ago or start more than
+# FUTURE_DAYS ahead are dropped. Entries whose date can't be parsed are always kept (sorted last).
+OUTPUT_PAST_DAYS = float(os.getenv("OUTPUT_PAST_DAYS", "30"))
+OUTPUT_FUTURE_DAYS = float(os.getenv("OUTPUT_FUTURE_DAYS", "365"))
+
+# The shapes already in seminars.json: 26-Jan-26, 2-Feb-2026, 11-March-2026, 8-Sept-25
+DATE_FORMATS = ["%d-%b-%y", "%d-%b-%Y", "%d-%B-%Y", "%d-%B-%y"]
+
+# "4:10 pm - 5:00 pm", "12:00 - 1:00 pm", "11:30a-12:45p", "4:00pm-6:00pm", "10:00 AM"
+TIME_RE = re.compile(
+    r'(?P<sh>\d{1,2})(?::(?P<sm>\d{2}))?\s*(?:(?P<sa>[ap])\.?m?\.?)?'
+    r'(?:\s*(?:-|–|—|to)\s*(?P<eh>\d{1,2})(?::(?P<em>\d{2}))?\s*(?:(?P<ea>[ap])\.?m?\.?)?)?',
+    re.IGNORECASE,
+)
+
+def _parse_mixed(text):
+    """
+    One free-form date, or NaT. Per value, since pandas 3 raises OutOfBoundsDatetime for the whole
+    Series (even with errors="coerce") when one string parses to a year like 1 ("Monday, Feb 2").
+    """
+    try:
+        day = pd.to_datetime(text, format="mixed")
+    except (ValueError, OverflowError):
+        return pd.NaT
+    if day.tzinfo is not None:
+        # Only the wall-clock date is used
+        day = day.tz_localize(None)
+    return day if pd.Timestamp.min <= day <= pd.Timestamp.max else pd.NaT
+
+def parse_dates(dates):
+    """
+    Vectorized: a Series of free-form date strings -> datetime64 Series (NaT where unparseable).
+    """
+    text = dates.fillna("").astype(str).str.strip().str.replace(r'(?i)-sept-', '-Sep-', regex=True)
+    parsed = pd.Series(pd.NaT, index=dates.index, dtype="datetime64[ns]")
+    for fmt in DATE_FORMATS:
+        missing = parsed.isna()
+        if not missing.any():
+            break
+        parsed[missing] = pd.to_datetime(text[missing], format=fmt, errors="coerce")
+    # Anything else Gemini came up with ("January 26, 2026", "2026-01-26", ...)
+    missing = parsed.isna() & text.ne("") & text.ne("N/A")
+    if missing.any():
+        parsed[missing] = pd.to_datetime(text[missing].map(_parse_mixed))
+    return parsed.dt.normalize()
+
+def _to_24h(hours, meridiem):
+    hours = hours % 12
+    return hours.where(meridiem.str.lower().ne("p"), hours + 12)
+
+def parse_times(times):
+    """
+    Vectorized: a Series of time strings -> (start_offset, end_offset) Timedelta Series from midnight.
+    A start without am/pm takes the end's (unless that would put it after the end); with neither,
+    1-7 o'clock is read as pm. A missing or non-positive end becomes start + 1 hour.
+    """
+    parts = times.fillna("").astype(str).str.extract(TIME_RE)
+    start_hour = pd.to_numeric(parts["sh"], errors="coerce")
+    end_hour = pd.to_numeric(parts["eh"], errors="coerce")
+    start_minute = pd.to_numeric(parts["sm"], errors="coerce").fillna(0)
+    end_minute = pd.to_numeric(parts["em"], errors="coerce").fillna(0)
+    start_meridiem = parts["sa"].fillna("")
+    end_meridiem = parts["ea"].fillna("")
+
+    end = _to_24h(end_hour, end_meridiem).where(end_meridiem.ne(""), end_hour) * 60 + end_minute
+
+    inherited = _to_24h(start_hour, end_meridiem) * 60 + start_minute
+    inherited = inherited.where(inherited <= end, inherited - 12 * 60)
+    start = (_to_24h(start_hour, start_meridiem) * 60 + start_minute).where(start_meridiem.ne(""), inherited)
+    bare = start_meridiem.eq("") & end_meridiem.eq("")
+    start = start.where(~bare, (start_hour.where(~start_hour.between(1, 7), start_hour + 12)) * 60 + start_minute)
+
+    end = end.where(end > start, start + 60)
+    return pd.to_timedelta(start, unit="m"), pd.to_timedelta(end, unit="m")
+
+def normalize_groups(groups, now=None):
+    """
+    Add date_iso, start_iso, start_epoch, end_epoch and sort_key to every entry of every
+    dumped SeminarFullyBaked dict, then sort each group by start and drop entries outside the window.
+    Display strings (date, time) are left untouched. Parses all entries of all groups in one pass.
+    """
+    rows = [(number, position, entry.get("date", ""), entry.get("time", ""))
+            for number, group in enumerate(groups) for position, entry in enumerate(group["entries"])]
+    if not rows:
+        return groups
+
+    df = pd.DataFrame(rows, columns=["group", "position", "date", "time"])
+    day = parse_dates(df["date"])
+    start_offset, end_offset = parse_times(df["time"])
+    has_time = start_offset.notna()
+
+    # No usable time: the event spans the whole day
+    start_local = day + start_offset.where(has_time, pd.Timedelta(0))
+    end_local = day + end_offset.where(has_time, pd.Timedelta(days=1))
+    # Times in the repeated hour when DST ends are read as standard time; skipped ones shift forward
+    standard = np.zeros(len(df), dtype=bool)
+    start = start_local.dt.tz_localize(SEMINAR_TZ, ambiguous=standard, nonexistent="shift_forward")
+    end = end_local.dt.tz_localize(SEMINAR_TZ, ambiguous=standard, nonexistent="shift_forward")
+
+    df["date_iso"] = day.dt.strftime("%Y-%m-%d")
+    df["start_iso"] = start.map(lambda value: value.isoformat(), na_action="ignore")
+    epoch = pd.Timestamp(0, tz="UTC")
+    df["start_epoch"] = (start - epoch) // pd.Timedelta(seconds=1)
+    df["end_epoch"] = (end - epoch) // pd.Timedelta(seconds=1)
+    # UTC ISO strings sort correctly as plain strings across DST changes
+    df["sort_key"] = start.dt.tz_convert("UTC").dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    now = time.time() if now is None else now
+    in_window = (
+        df["start_epoch"].isna()
+        | ((df["end_epoch"] >= now - OUTPUT_PAST_DAYS * 86400) & (df["start_epoch"] <= now + OUTPUT_FUTURE_DAYS * 86400))
+    )
+    df = df[in_window].sort_values(["group", "sort_key", "position"], na_position="last", kind="stable")
+
+    entries = {number: [] for number in range(len(groups))}
+    for row in df.itertuples(index=False):
+        entry = groups[row.group]["entries"][row.position]
+        entry["date_iso"] = row.date_iso if isinstance(row.date_iso, str) else None
+        entry["start_iso"] = row.start_iso if isinstance(row.start_iso, str) else None
+        entry["start_epoch"] = int(row.start_epoch) if pd.notna(row.start_epoch) else None
+        entry["end_epoch"] = int(row.end_epoch) if pd.notna(row.end_epoch) else None
+        entry["sort_key"] = row.sort_key if isinstance(row.sort_key, str) else None
+        entries[row.group].append(entry)
+
+    for number, group in enumerate(groups):
+        group["entries"] = entries[number]
+    return groups
@@ -0,0 +1,137 @@
+from datetime import datetime, date
+from bs4 import BeautifulSoup
+import os, time
+
+from extractors import event_hint, parse_date, find_dates
+
+# Events are kept from WINDOW_PAST_DAYS ago to WINDOW_DAYS ahead of now, before anything goes to Gemini.
+# input.csv `window_days` / `window_past_days` columns override these per row.
+WINDOW_DAYS = float(os.getenv("WINDOW_DAYS", "14"))
+WINDOW_PAST_DAYS = float(os.getenv("WINDOW_PAST_DAYS", "0"))
+# false sends every scrape_1/scrape_3 event to Gemini whatever its date (scrape_2's listing is always windowed)
+DATE_WINDOW = os.getenv("DATE_WINDOW", "true").lower() == "true"
+
+def _days(row, name, default):
+    try:
+        value = float(row.get(name))
+    except (TypeError, ValueError):
+        return default
+    return default if value != value else value # Empty CSV cells are NaN
+
+class DateWindow:
+    """
+    One row's date window, from `past_days` ago to `days` ahead of `now`.
+
+    Scrapers add the dates of events they dropped for starting after the window to `later_dates`.
+    The pre-check stores them with the result, so on a later day it can tell whether an unchanged
+    page's cached result is still complete (see `admits`).
+    """
+
+    def __init__(self, past_days, days, now=None):
+        now = time.time() if now is None else now
+        self.past_days = past_days
+        self.days = days
+        self.start_ts = now - past_days * 86400
+        self.end_ts = now + days * 86400
+        self.later_dates = []
+
+    @property
+    def first(self):
+        return datetime.fromtimestamp(self.start_ts).date()
+
+    @property
+    def last(self):
+        return datetime.fromtimestamp(self.end_ts).date()
+
+    def variant(self):
+        """
+        The window's shape, not its dates, so the pre-check can reuse a result on later days.
+        """
+        return f"-{self.past_days:g}d..+{self.days:g}d"
+
+    def admits(self, later_dates):
+        """
+        True if a result built when `later_dates` were beyond the window is still complete today,
+        i.e. none of those events has moved into the window since.
+        """
+        return not any(date.fromisoformat(day) <= self.last for day in later_dates or [])
+
+    def refilter(self, seminar):
+        """
+        Drop entries of a reused SeminarFullyBaked dict that are now before the window. Undated entries stay.
+        """
+        entries = []
+        for entry in seminar["entries"]:
+            day = parse_date(entry.get("date") or "")
+            if not day or datetime.strptime(day, "%d-%b-%y").date() >= self.first:
+                entries.append(entry)
+        return {**seminar, "entries": entries}
+
+def row_window(row, now=None):
+    """
+    The DateWindow for one input.csv row.
+    """
+    return DateWindow(_days(row, "window_past_days", WINDOW_PAST_DAYS), _days(row, "window_days", WINDOW_DAYS), now)
+
+def hint_date(payload):
+    """
+    Cheap date of one event block: a machine-readable attribute if there is one, else the same
+    title/date/speaker hint the dedup index uses. None if the block can't be dated without Gemini.
+    """
+    soup = BeautifulSoup(payload, 'html.parser')
+    tag = soup.find(attrs={"data-start-time": True})
+    if tag is not None:
+        try:
+            return datetime.fromtimestamp(int(tag["data-start-time"])).date()
+        except ValueError:
+            pass
+    tag = soup.find("time", attrs={"datetime": True})
+    if tag is not None:
+        try:
+            return date.fromisoformat(tag["datetime"][:10])
+        except ValueError:
+            pass
+
+    _, text_date, _ = event_hint(payload)
+    if not text_date:
+        return None
+    return datetime.strptime(text_date, "%d-%b-%y").date()
+
+def block_dates(payload):
+    """
+    Every date one block mentions, from data-start-time / <time datetime> attributes and its text.
+    """
+    soup = BeautifulSoup(payload, 'html.parser')
+    days = set()
+    for tag in soup.find_all(attrs={"data-start-time": True}):
+        try:
+            days.add(datetime.fromtimestamp(int(tag["data-start-time"])).date())
+        except ValueError:
+            pass
+    for tag in soup.find_all("time", attrs={"datetime": True}):
+        try:
+            days.add(date.fromisoformat(tag["datetime"][:10]))
+        except ValueError:
+            pass
+    days |= {datetime.strptime(day, "%d-%b-%y").date() for day in find_dates(soup.get_text("\n"))}
+    return days
+
+def filter_window(blocks, start_ts, end_ts):
+    """
+    Keep the event blocks dated inside [start_ts, end_ts] (compared by day). Undated blocks are kept,
+    so Gemini still sees anything that can't be dated cheaply, and so are blocks with more than one
+    distinct date, which may hold several talks that weren't split apart. Runs on a parse worker (see parse_pipeline.py).
+    Returns (kept, dropped count, ISO dates of the dropped blocks that start after the window).
+    """
+    first, last = datetime.fromtimestamp(start_ts).date(), datetime.fromtimestamp(end_ts).date()
+    kept, later = [], []
+    for block in blocks:
+        if len(block_dates(block)) > 1:
+            kept.append(block)
+            continue
+        day = hint_date(block)
+        if day is None or first <= day <= last:
+            kept.append(block)
+        elif day > last:
+            later.append(day.isoformat())
+    return kept, len(blocks) - len(kept), later
@@ -0,0 +1,74 @@
+import re, asyncio, hashlib
+
+from extractors import parse_date, split_speaker
+
+HONORIFICS_RE = re.compile(r'^(?:dr|prof|professor|mr|mrs|ms)\.?\s+', re.IGNORECASE)
+NON_ALNUM_RE = re.compile(r'[^a-z0-9]+')
+
+def _normalize(text):
+    return NON_ALNUM_RE.sub(' ', (text or "").lower()).strip()
+
+def dedup_key(title, date, speaker):
+    """
+    Fingerprint of a talk from its normalized title, date and speaker name, or None if any is missing.
+    The same talk listed by several series (or departments) gets the same key.
+    """
+    title = _normalize(title)
+    day = parse_date(date or "")
+    name = _normalize(HONORIFICS_RE.sub('', split_speaker(speaker or "")[0]))
+    if not (title and day and name) or "n a" in (title, name):
+        return None
+    return hashlib.sha256(f"{title}|{day}|{name}".encode("utf-8")).hexdigest()
+
+def entry_key(entry):
+    """
+    dedup_key of an Entry or a dumped entry dict.
+    """
+    if not isinstance(entry, dict):
+        entry = entry.model_dump()
+    return dedup_key(entry.get("seminar_title"), entry.get("date"), entry.get("speaker"))
+
+class DedupIndex:
+    """
+    Cross-row index of events on their way to Gemini, keyed by dedup_key.
+
+    The first row to claim a key extracts the event; every other row that lists the same talk awaits
+    that extraction instead of paying for its own. If the owner's extraction fails (or its entries
+    can't be matched back to the key), waiters get None and extract the event themselves.
+    Rows run as tasks on one event loop, so no lock is needed.
+    """
+
+    def __init__(self):
+        self._claims = {}
+        self.metrics = {"claimed": 0, "shared": 0, "fallbacks": 0}
+
+    def claim(self, key, series):
+        """
+        Returns (is_owner, owner_series, future). The future resolves to a list of entry dicts or None.
+        """
+        if key in self._claims:
+            owner_series, future = self._claims[key]
+            return False, owner_series, future
+        future = asyncio.get_running_loop().create_future()
+        self._claims[key] = (series, future)
+        self.metrics["claimed"] += 1
+        return True, series, future
+
+    def resolve(self, key, entries):
+        _, future = self._claims[key]
+        if not future.done():
+            future.set_result(entries)
+
+    async def wait(self, future):
+        entries = await future
+        self.metrics["shared" if entries else "fallbacks"] += 1
+        return entries
+
+    def clear(self):
+        """
+        Forget every claim (the daemon starts each refresh fresh, so an old extraction is never reused).
+        """
+        self._claims = {}
+
+    def stats(self):
+        return dict(self.metrics)
@@ -0,0 +1,45 @@
+from pathlib import Path
+import json, hashlib
+
+from atomic_io import atomic_write
+
+def fingerprint(payload):
+    """
+    Stable hash of one event: an HTML string (whitespace-normalized) or a scraped event dict.
+    """
+    if isinstance(payload, str):
+        text = " ".join(payload.split())
+    else:
+        text = json.dumps(payload, sort_keys=True)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+class EventIndex:
+    """
+    Maps each series to {event fingerprint: extracted entries} from the previous run,
+    so only new or changed events need to go through Gemini.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.series = {}
+        if self.path.exists():
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    self.series = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Could not read event index {self.path}, starting fresh: {e}")
+                self.series = {}
+
+    @staticmethod
+    def _key(department, series):
+        return f"{department}|{series}"
+
+    def get(self, department, series):
+        return self.series.get(self._key(department, series), {})
+
+    def set(self, department, series, events):
+        # Replacing the whole mapping drops events that disappeared from the page
+        self.series[self._key(department, series)] = events
+
+    def save(self):
+        atomic_write(self.path, json.dumps(self.series))
@@ -0,0 +1,211 @@
+from bs4 import BeautifulSoup
+from datetime import datetime
+import os, re
+
+from models import Entry
+
+# Entries scoring below this go to Gemini instead
+RULES_MIN_CONFIDENCE = float(os.getenv("RULES_MIN_CONFIDENCE", "0.75"))
+
+# --- LABELS: "Speaker: ...", "Date: ...", etc. mapped onto Entry fields ---
+LABELS = {
+    "title": "seminar_title", "talk": "seminar_title", "topic": "seminar_title", "talk title": "seminar_title",
+    "speaker": "speaker", "presenter": "speaker", "speakers": "speaker",
+    "affiliation": "affiliation", "institution": "affiliation",
+    "date": "date",
+    "time": "time",
+    "location": "location", "place": "location", "room": "location", "venue": "location", "where": "location",
+    "abstract": "abstract", "summary": "abstract",
+    "bio": "bio", "biography": "bio", "about the speaker": "bio", "speaker bio": "bio",
+}
+LABEL_RE = re.compile(
+    r'^\s*(' + '|'.join(sorted((re.escape(label) for label in LABELS), key=len, reverse=True)) + r')\s*:\s*(.*)$',
+    re.IGNORECASE,
+)
+
+MONTHS = r'(Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|June?|July?|Aug(?:ust)?|Sept?(?:ember)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)\.?'
+DATE_PATTERNS = [
+    # January 26, 2026 / Jan. 26 2026
+    (re.compile(MONTHS + r'\s+(\d{1,2})(?:st|nd|rd|th)?,?\s+(\d{4})', re.IGNORECASE), ("month", "day", "year")),
+    # 26 January 2026
+    (re.compile(r'(\d{1,2})\s+' + MONTHS + r',?\s+(\d{4})', re.IGNORECASE), ("day", "month", "year")),
+    # 26-Jan-26 / 2-Feb-2026
+    (re.compile(r'(\d{1,2})-' + MONTHS + r'-(\d{2,4})', re.IGNORECASE), ("day", "month", "year")),
+    # 1/26/2026
+    (re.compile(r'(\d{1,2})/(\d{1,2})/(\d{2,4})'), ("month", "day", "year")),
+]
+TIME_RE = re.compile(
+    r'\d{1,2}(?::\d{2})?\s*(?:[ap]\.?m\.?)?\s*(?:-|–|—|to)\s*\d{1,2}(?::\d{2})?\s*[ap]\.?m\.?'
+    r'|\d{1,2}:\d{2}\s*[ap]\.?m\.?',
+    re.IGNORECASE,
+)
+# Fields one talk has exactly one of; a block labelling one twice holds several talks
+SINGLE_VALUED = {"seminar_title", "date", "time", "speaker"}
+SPEAKER_AFFILIATION_RE = re.compile(r'^(.+?)\s*[\(,]\s*(.+?)\)?\s*$')
+
+def _month_number(text):
+    return datetime.strptime(text[:3].title(), "%b").month
+
+def _format_date(match, order):
+    parts = dict(zip(order, match.groups()))
+    try:
+        month = int(parts["month"]) if parts["month"].isdigit() else _month_number(parts["month"])
+        year = int(parts["year"])
+        if year < 100:
+            year += 2000
+        return datetime(year, month, int(parts["day"])).strftime("%d-%b-%y")
+    except ValueError:
+        return ""
+
+def parse_date(text):
+    """
+    Find the first recognizable date in `text` and format it like the rest of seminars.json (dd-MMM-yy).
+    """
+    for pattern, order in DATE_PATTERNS:
+        match = pattern.search(text)
+        if not match:
+            continue
+        day = _format_date(match, order)
+        if day:
+            return day
+    return ""
+
+def find_dates(text):
+    """
+    Every recognizable date in `text`, as a set of dd-MMM-yy strings.
+    """
+    return {day for pattern, order in DATE_PATTERNS for match in pattern.finditer(text) for day in [_format_date(match, order)] if day}
+
+def parse_time(text):
+    match = TIME_RE.search(text)
+    return match.group(0).strip() if match else ""
+
+def split_speaker(text):
+    """
+    "Jane Doe (UCLA)" / "Jane Doe, UCLA" -> ("Jane Doe", "UCLA")
+    """
+    match = SPEAKER_AFFILIATION_RE.match(text)
+    if match:
+        return match.group(1).strip(), match.group(2).strip()
+    return text.strip(), ""
+
+def confidence(entry):
+    """
+    Share of the core fields we managed to fill. Title, date and speaker are mandatory.
+    """
+    if not (entry.seminar_title and entry.date and entry.speaker):
+        return 0.0
+    fields = [entry.seminar_title, entry.date, entry.time, entry.location, entry.speaker, entry.abstract]
+    return sum(1 for value in fields if value) / len(fields)
+
+def is_confident(entry):
+    return entry is not None and confidence(entry) >= RULES_MIN_CONFIDENCE
+
+def entry_from_event(event):
+    """
+    scrape_2: the deep-scraped event dict already has every field, so map it straight onto Entry.
+    """
+    speaker = event.get("speaker", "")
+    if speaker == "See Abstract":
+        speaker = ""
+    speaker, affiliation = split_speaker(speaker) if speaker else ("", "")
+
+    location = event.get("location", "")
+    if location == "Location not specified":
+        location = ""
+    bio = event.get("speaker_bio", "")
+    if bio == "Not detected in text":
+        bio = ""
+
+    title = event.get("title", "")
+    if title == "No Title":
+        title = ""
+
+    return Entry(
+        seminar_title=title,
+        date=event.get("date_display", ""),
+        location=location,
+        time=event.get("time_display", ""),
+        speaker=speaker,
+        affiliation=affiliation,
+        abstract=event.get("abstract", ""),
+        bio=bio,
+    )
+
+def entry_from_html_block(html):
+    """
+    scrape_1: one event block of "Label: value" lines (Date:, Speaker:, Abstract: ...) as on stat.columbia.edu.
+    Returns None when the block doesn't look like a labeled event at all, or looks like several
+    (a Date/Time/Speaker/Title label repeated), so Gemini extracts it instead.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    lines = [line.strip() for line in soup.get_text("\n").split("\n") if line.strip()]
+    if not lines:
+        return None
+
+    fields = {}
+    current = None
+    unlabeled = []
+    for line in lines:
+        match = LABEL_RE.match(line)
+        if match:
+            current = LABELS[match.group(1).lower()]
+            if current in SINGLE_VALUED and current in fields:
+                return None
+            fields.setdefault(current, [])
+            if match.group(2):
+                fields[current].append(match.group(2).strip())
+        elif current in ("abstract", "bio"):
+            # Long fields run on until the next label
+            fields[current].append(line)
+        else:
+            unlabeled.append(line)
+
+    if not fields:
+        return None
+
+    values = {key: "\n".join(parts).strip() for key, parts in fields.items()}
+
+    # Title falls back to the block's heading
+    if not values.get("seminar_title"):
+        heading = soup.find(['h1', 'h2', 'h3', 'h4'])
+        values["seminar_title"] = heading.get_text(" ", strip=True) if heading else ""
+
+    # Date/time are often on one unlabeled line ("Monday, January 26, 2026 4:10 pm - 5:00 pm")
+    text = "\n".join(lines)
+    values["date"] = parse_date(values.get("date", "")) or parse_date(text)
+    values["time"] = parse_time(values.get("time", "")) or parse_time(text)
+
+    if values.get("speaker") and not values.get("affiliation"):
+        values["speaker"], values["affiliation"] = split_speaker(values["speaker"])
+
+    return Entry(
+        seminar_title=values.get("seminar_title", ""),
+        date=values["date"],
+        location=values.get("location", ""),
+        time=values["time"],
+        speaker=values.get("speaker", ""),
+        affiliation=values.get("affiliation", ""),
+        abstract=values.get("abstract", ""),
+        bio=values.get("bio", ""),
+    )
+
+def event_hint(payload):
+    """
+    Best-effort (title, date, speaker) for any event payload, for matching cross-listed talks before Gemini.
+    Unlike the rules above this doesn't need to be confident, just consistent.
+    """
+    if isinstance(payload, dict):
+        entry = entry_from_event(payload)
+        return entry.seminar_title, entry.date, entry.speaker
+
+    entry = entry_from_html_block(payload)
+    if entry is not None and entry.seminar_title and entry.date and entry.speaker:
+        return entry.seminar_title, entry.date, entry.speaker
+
+    # Unlabeled cards (seminars.app): heading, first date in the text, element whose class mentions the speaker
+    soup = BeautifulSoup(payload, 'html.parser')
+    heading = soup.find(['h1', 'h2', 'h3', 'h4'])
+    speaker_tag = soup.find(class_=lambda c: c and 'speaker' in c.lower())
+    speaker = split_speaker(speaker_tag.get_text(" ", strip=True))[0] if speaker_tag else ""
+    return heading.get_text(" ", strip=True) if heading else "", parse_date(soup.get_text("\n")), speaker
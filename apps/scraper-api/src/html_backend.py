@@ -0,0 +1,101 @@
+from bs4 import BeautifulSoup
+from lxml import etree, html as lxml_html
+import os
+import re
+import soupsieve
+
+class SoupBackend:
+    """
+    BeautifulSoup + html.parser, with CSS selectors compiled once by soupsieve. The reference the lxml backend is checked against.
+    """
+    name = "soup"
+
+    def compile(self, css):
+        return soupsieve.compile(css)
+
+    def parse(self, html):
+        return BeautifulSoup(html, 'html.parser')
+
+    def select_one(self, node, selector):
+        return selector.select_one(node)
+
+    def select(self, node, selector):
+        return selector.select(node)
+
+    def text(self, node, separator=""):
+        return node.get_text(separator, strip=True)
+
+    def attr(self, node, name):
+        return node.get(name)
+
+# The CSS page_parsers.py uses: tag.class, tag[attr], tag[attr*="value"] and tag[attr*="value" i]
+CSS_RE = re.compile(r'^(?P<tag>[a-z0-9]+)(?:\.(?P<cls>[\w-]+)|\[(?P<attr>[\w-]+)(?:\*="(?P<value>[^"]*)"(?P<ci>\s+i)?)?\])$')
+UPPER, LOWER = "ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz"
+# BeautifulSoup's get_text() leaves out script/style contents; so does LxmlBackend.text()
+SKIP_TEXT = {"script", "style", "template"}
+
+class LxmlBackend:
+    """
+    lxml's libxml2 HTML parser, with selectors translated to XPath and compiled once.
+    Same interface and output as SoupBackend.
+    """
+    name = "lxml"
+
+    def __init__(self):
+        self.parser = lxml_html.HTMLParser(encoding="utf-8")
+
+    def compile(self, css):
+        match = CSS_RE.match(css.strip())
+        if match is None:
+            raise ValueError(f"LxmlBackend can't compile selector {css!r}")
+        tag, cls, attr, value = match.group('tag', 'cls', 'attr', 'value')
+        if cls is not None:
+            predicate = f"contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')"
+        elif value is None:
+            predicate = f"@{attr}"
+        elif match.group('ci'):
+            predicate = f"contains(translate(@{attr}, '{UPPER}', '{LOWER}'), '{value.lower()}')"
+        else:
+            predicate = f"contains(@{attr}, '{value}')"
+        return etree.XPath(f"descendant::{tag}[{predicate}]")
+
+    def parse(self, html):
+        if not html or not html.strip():
+            html = "<html></html>"
+        return lxml_html.document_fromstring(html.encode("utf-8"), parser=self.parser)
+
+    def select_one(self, node, selector):
+        found = selector(node)
+        return found[0] if found else None
+
+    def select(self, node, selector):
+        return selector(node)
+
+    def text(self, node, separator=""):
+        parts = []
+        def walk(element):
+            if isinstance(element.tag, str) and element.tag not in SKIP_TEXT and element.text:
+                parts.append(element.text)
+            for child in element:
+                if isinstance(child.tag, str):
+                    walk(child)
+                if child.tail:
+                    parts.append(child.tail)
+        walk(node)
+        # Match BeautifulSoup's get_text(separator, strip=True): stripped, non-empty text nodes only
+        return separator.join(part for part in (part.strip() for part in parts) if part)
+
+    def attr(self, node, name):
+        return node.get(name)
+
+BACKENDS = {"lxml": LxmlBackend, "soup": SoupBackend}
+
+def get_backend(name=None):
+    """
+    HTML_BACKEND=lxml|soup. Defaults to lxml.
+    """
+    name = (name or os.getenv("HTML_BACKEND", "lxml")).lower()
+    if name not in BACKENDS:
+        print(f"Unknown HTML_BACKEND={name}; using lxml")
+        name = "lxml"
+    return BACKENDS[name]()
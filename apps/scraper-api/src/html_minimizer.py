@@ -0,0 +1,50 @@
+from bs4 import BeautifulSoup, Comment
+import re
+
+# Tags that never carry seminar text
+DROP_TAGS = ['script', 'style', 'noscript', 'svg', 'iframe', 'img', 'picture', 'video', 'button', 'form', 'input', 'link', 'meta']
+
+# Attributes that still mean something to the LLM (everything else is layout noise)
+KEEP_ATTRS = {'datetime', 'data-start-time'}
+
+WHITESPACE_RE = re.compile(r'\s+')
+BETWEEN_TAGS_RE = re.compile(r'>\s+<')
+
+def minimize_html(html):
+    """
+    Strip scripts, styles, comments, attributes and redundant whitespace, keeping only text-bearing structure.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+
+    for tag in soup.find_all(DROP_TAGS):
+        tag.decompose()
+    for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
+        comment.extract()
+    for tag in soup.find_all(True):
+        tag.attrs = {key: value for key, value in tag.attrs.items() if key in KEEP_ATTRS}
+
+    text = WHITESPACE_RE.sub(' ', str(soup))
+    return BETWEEN_TAGS_RE.sub('><', text).strip()
+
+def estimate_tokens(text):
+    """
+    Rough token count (~4 characters per token), good enough for budgeting requests.
+    """
+    return (len(text) + 3) // 4
+
+def chunk_blocks(blocks, budget):
+    """
+    Pack event blocks in order into chunks of at most `budget` estimated tokens.
+    Chunks only ever break between events; a single oversized event gets a chunk of its own.
+    """
+    chunks, current, current_tokens = [], [], 0
+    for block in blocks:
+        tokens = estimate_tokens(block)
+        if current and current_tokens + tokens > budget:
+            chunks.append(current)
+            current, current_tokens = [], 0
+        current.append(block)
+        current_tokens += tokens
+    if current:
+        chunks.append(current)
+    return chunks
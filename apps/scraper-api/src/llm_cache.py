@@ -0,0 +1,132 @@
+from pathlib import Path
+import os, json, time, hashlib, threading
+
+from atomic_io import atomic_write, STALE_TMP_SECONDS
+
+class LLMCache:
+    """
+    Content-addressed on-disk cache of validated Gemini extraction results.
+
+    Keys hash everything that can change the answer (normalized input, prompt, model, response schema),
+    so an unchanged seminar page never costs a second Gemini call. Entries expire after `max_age` seconds
+    and the oldest are evicted once the directory grows past `max_bytes`, when evict() runs at the end of a run.
+    """
+
+    def __init__(self, directory=None, max_bytes=None, max_age=None):
+        self.directory = Path(directory or os.getenv("LLM_CACHE_DIR", ".llm_cache"))
+        self.max_bytes = max_bytes or int(float(os.getenv("LLM_CACHE_MAX_MB", "100")) * 1024 * 1024)
+        self.max_age = max_age or float(os.getenv("LLM_CACHE_MAX_AGE_DAYS", "7")) * 24 * 60 * 60
+        self.enabled = os.getenv("LLM_CACHE", "true").lower() == "true"
+
+        # parse_html runs in worker threads, so guard the counters
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(normalized_input, prompt, model, schema):
+        digest = hashlib.sha256()
+        for part in (normalized_input, prompt, model, json.dumps(schema, sort_keys=True)):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key):
+        """
+        Return the cached JSON text for `key`, or None on a miss or expired entry.
+        """
+        if not self.enabled:
+            return None
+
+        path = self._path(key)
+        try:
+            age = time.time() - path.stat().st_mtime
+            if age > self.max_age:
+                path.unlink()
+                with self._lock:
+                    self.evictions += 1
+                    self.misses += 1
+                return None
+            value = path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def put(self, key, value):
+        if not self.enabled:
+            return
+
+        # Write to a temp file and rename so a crash never leaves a half-written entry
+        atomic_write(self._path(key), value)
+
+        with self._lock:
+            self.writes += 1
+
+    def delete(self, key):
+        self._unlink(self._path(key))
+
+    @staticmethod
+    def _unlink(path):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def evict(self):
+        """
+        Drop expired entries, then the oldest ones until the cache fits in max_bytes.
+        Temp files left behind by a killed process count towards the size and are removed once stale.
+        Scans the whole directory, so it runs once per run (or daemon refresh), not on every put.
+        """
+        if not self.enabled:
+            return
+        now = time.time()
+        entries = []
+        total = 0
+        for path in self.directory.glob("*/*"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if path.suffix == ".tmp":
+                if now - stat.st_mtime > STALE_TMP_SECONDS:
+                    self._unlink(path)
+                else:
+                    total += stat.st_size # Possibly still being written; leave it alone
+                continue
+            if path.suffix == ".json":
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        entries.sort()
+        total += sum(size for _, size, _ in entries)
+        evicted = 0
+        for mtime, size, path in entries:
+            if now - mtime <= self.max_age and total <= self.max_bytes:
+                continue
+            self._unlink(path)
+            total -= size
+            evicted += 1
+
+        with self._lock:
+            self.evictions += evicted
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "writes": self.writes,
+                "evictions": self.evictions,
+            }
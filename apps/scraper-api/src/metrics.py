@@ -0,0 +1,181 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+import os, json, time, uuid, threading
+
+from atomic_io import atomic_write
+
+# metrics.jsonl keeps the records of this many runs (the daemon counts each refresh as a run)
+METRICS_KEEP_RUNS = int(os.getenv("METRICS_KEEP_RUNS", "50"))
+
+# Which input.csv row the current code is working for. asyncio tasks and asyncio.to_thread
+# copy contextvars, so spans deep inside parse_html still know their row.
+_row = ContextVar("row", default={})
+
+def _escape(value):
+    """
+    Prometheus label values escape backslashes, double quotes and newlines.
+    """
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+class Tracer:
+    """
+    Collects timing spans and counters for every stage of every row, then exports them
+    as JSON lines (one record per span/event) and a Prometheus textfile.
+    """
+
+    def __init__(self):
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started = time.time()
+        self.records = []
+        self._lock = threading.Lock()
+
+    def reset(self):
+        """
+        Start a new run: drop the records (once exported) and restart the clock. Used by the daemon after each refresh.
+        """
+        with self._lock:
+            self.records = []
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started = time.time()
+
+    def set_row(self, index, department, series):
+        _row.set({"row": int(index), "department": department, "series": series})
+
+    def _emit(self, record):
+        record = {"run_id": self.run_id, "ts": round(time.time(), 3), **_row.get(), **record}
+        with self._lock:
+            self.records.append(record)
+
+    @contextmanager
+    def span(self, stage, **attrs):
+        """
+        Time a stage: `with tracer.span("navigate", url=link):`. Exceptions are recorded and re-raised.
+        """
+        start = time.perf_counter()
+        status = "ok"
+        try:
+            yield attrs
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            self._emit({
+                "type": "span",
+                "stage": stage,
+                "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+                "status": status,
+                **attrs,
+            })
+
+    def event(self, name, **values):
+        """
+        A point-in-time record, e.g. token counts or a retry.
+        """
+        self._emit({"type": "event", "stage": name, **values})
+
+    def summary(self):
+        """
+        Aggregate spans per (stage, department, series) and sum token/retry events.
+        """
+        stages = {}
+        tokens = {}
+        retries = {}
+        with self._lock:
+            records = list(self.records)
+
+        for record in records:
+            labels = (record.get("department", ""), record.get("series", ""))
+            if record["type"] == "span":
+                key = (record["stage"],) + labels
+                stat = stages.setdefault(key, {"count": 0, "seconds": 0.0, "errors": 0})
+                stat["count"] += 1
+                stat["seconds"] += record["duration_ms"] / 1000
+                stat["errors"] += record["status"] == "error"
+            elif record["stage"] == "gemini_tokens":
+                for direction in ("input", "output"):
+                    key = (direction,) + labels
+                    tokens[key] = tokens.get(key, 0) + (record.get(f"{direction}_tokens") or 0)
+            elif record["stage"] == "gemini_retry":
+                retries[labels] = retries.get(labels, 0) + 1
+        return stages, tokens, retries
+
+    def write_jsonl(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            records = list(self.records)
+        # The file keeps a history of runs, keyed by run_id, capped to the last METRICS_KEEP_RUNS
+        lines = []
+        if path.exists():
+            with open(path, encoding="utf-8") as f:
+                lines = [line for line in f if line.strip()]
+        lines += [json.dumps(record) + "\n" for record in records]
+
+        run_ids = []
+        for line in lines:
+            try:
+                run_id = json.loads(line).get("run_id")
+            except ValueError:
+                run_id = None
+            run_ids.append(run_id)
+        keep = set(list(dict.fromkeys(run_id for run_id in run_ids if run_id is not None))[-max(METRICS_KEEP_RUNS, 1):])
+        atomic_write(path, "".join(line for line, run_id in zip(lines, run_ids) if run_id in keep))
+
+    def write_prometheus(self, path):
+        stages, tokens, retries = self.summary()
+
+        def labels(**pairs):
+            return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs.items()) + "}"
+
+        lines = [
+            "# HELP liontalk_scraper_stage_seconds Time spent per scraper stage.",
+            "# TYPE liontalk_scraper_stage_seconds summary",
+        ]
+        for (stage, department, series), stat in sorted(stages.items()):
+            label = labels(stage=stage, department=department, series=series)
+            lines.append(f"liontalk_scraper_stage_seconds_sum{label} {stat['seconds']:.6f}")
+            lines.append(f"liontalk_scraper_stage_seconds_count{label} {stat['count']}")
+
+        lines += [
+            "# HELP liontalk_scraper_stage_errors_total Failed spans per scraper stage.",
+            "# TYPE liontalk_scraper_stage_errors_total counter",
+        ]
+        for (stage, department, series), stat in sorted(stages.items()):
+            lines.append(f"liontalk_scraper_stage_errors_total{labels(stage=stage, department=department, series=series)} {stat['errors']}")
+
+        lines += [
+            "# HELP liontalk_scraper_gemini_tokens_total Gemini tokens used, by direction.",
+            "# TYPE liontalk_scraper_gemini_tokens_total counter",
+        ]
+        for (direction, department, series), count in sorted(tokens.items()):
+            lines.append(f"liontalk_scraper_gemini_tokens_total{labels(direction=direction, department=department, series=series)} {count}")
+
+        lines += [
+            "# HELP liontalk_scraper_gemini_retries_total Gemini calls retried after overload errors.",
+            "# TYPE liontalk_scraper_gemini_retries_total counter",
+        ]
+        for (department, series), count in sorted(retries.items()):
+            lines.append(f"liontalk_scraper_gemini_retries_total{labels(department=department, series=series)} {count}")
+
+        lines += [
+            "# HELP liontalk_scraper_run_duration_seconds Wall-clock time of the last run.",
+            "# TYPE liontalk_scraper_run_duration_seconds gauge",
+            f"liontalk_scraper_run_duration_seconds {time.time() - self.started:.3f}",
+            "# HELP liontalk_scraper_last_run_timestamp_seconds When the last run finished.",
+            "# TYPE liontalk_scraper_last_run_timestamp_seconds gauge",
+            f"liontalk_scraper_last_run_timestamp_seconds {time.time():.0f}",
+        ]
+
+        # node_exporter may read the file at any moment, so replace it atomically
+        atomic_write(path, "\n".join(lines) + "\n")
+
+    def export(self, directory):
+        directory = Path(directory)
+        self.write_jsonl(directory / "metrics.jsonl")
+        self.write_prometheus(directory / "scraper.prom")
+        print(f"Metrics for run {self.run_id} written to {directory} (finished {datetime.now(timezone.utc).isoformat()})")
+
+# Shared by every module in the process
+tracer = Tracer()
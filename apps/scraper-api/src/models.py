@@ -0,0 +1,28 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+class Entry(BaseModel):
+    seminar_title: str = Field(description="The title of the seminar.")
+    date: str = Field(description="Date of the seminar in dd-MMM-yy format.")
+    location: str = Field(description="Building location.")
+    time: str = Field(description="Time of the seminar.")
+    speaker: str = Field(description="Name of the speaker.")
+    affiliation: str = Field(description="Speaker's affiliated school or organization.")
+    abstract: str = Field(description="Brief detail overview of the seminar topic.")
+    bio: str = Field(description="Information about the speaker.")
+
+class SeminarHalfBaked(BaseModel):
+    """
+    Intermediate schema for Gemini processing.
+    'HalfBaked' implies this data is raw from the LLM and missing external metadata (department, series).
+    """
+    entries: List[Entry]
+
+class SeminarFullyBaked(BaseModel):
+    """
+    Final schema for output.
+    'FullyBaked' implies the data is complete, combining LLM extraction with CSV metadata.
+    """
+    department: str
+    series: str
+    entries: List[Entry]
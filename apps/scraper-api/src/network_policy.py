@@ -0,0 +1,63 @@
+from urllib.parse import urlparse
+import os
+
+from metrics import tracer
+
+# Set BLOCK_REQUESTS=false to let pages load everything (useful when debugging a selector in headed mode)
+BLOCK_REQUESTS = os.getenv("BLOCK_REQUESTS", "true").lower() == "true"
+
+# Nothing we extract lives in these
+DEFAULT_BLOCKED_TYPES = {"image", "media", "font", "stylesheet", "manifest", "texttrack", "eventsource", "websocket"}
+
+# Analytics / ads / embeds that every Columbia page pulls in
+DEFAULT_BLOCKED_DOMAINS = {
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "googlesyndication.com",
+    "facebook.net", "facebook.com", "twitter.com", "x.com", "linkedin.com", "hotjar.com",
+    "siteimprove.com", "siteimproveanalytics.com", "newrelic.com", "nr-data.net", "youtube.com",
+    "vimeo.com", "addthis.com", "sharethis.com", "fonts.googleapis.com", "fonts.gstatic.com",
+}
+
+class NetworkPolicy:
+    """
+    What a source's pages may download, and the selector that means the page is ready to scrape.
+    Replaces slow_mo and wait_until="networkidle" with an explicit readiness condition.
+    """
+
+    def __init__(self, ready_selector, ready_timeout=30000, block_types=None, block_domains=None):
+        self.ready_selector = ready_selector
+        self.ready_timeout = ready_timeout
+        self.block_types = DEFAULT_BLOCKED_TYPES if block_types is None else block_types
+        self.block_domains = DEFAULT_BLOCKED_DOMAINS if block_domains is None else block_domains
+        self.blocked = 0
+        self.allowed = 0
+
+    async def apply(self, page):
+        if BLOCK_REQUESTS:
+            await page.route("**/*", self._handle)
+
+    async def _handle(self, route):
+        request = route.request
+        host = urlparse(request.url).hostname or ""
+        if request.resource_type in self.block_types or any(host == domain or host.endswith("." + domain) for domain in self.block_domains):
+            self.blocked += 1
+            await route.abort()
+        else:
+            self.allowed += 1
+            await route.continue_()
+
+    async def wait_ready(self, page):
+        with tracer.span("selector_wait", selector=self.ready_selector):
+            await page.wait_for_selector(self.ready_selector, timeout=self.ready_timeout)
+
+    def stats(self):
+        return {"blocked": self.blocked, "allowed": self.allowed}
+
+# Keyed by the scrape_method column of input.csv
+NETWORK_POLICIES = {
+    # stat.columbia.edu: server-rendered, content is in the initial HTML
+    1: NetworkPolicy(ready_selector="#seminar-content", ready_timeout=10000),
+    # Drupal calendars: server-rendered listing and detail pages
+    2: NetworkPolicy(ready_selector="div.view-content", ready_timeout=10000),
+    # columbia.seminars.app: JS app, needs its scripts and XHR but not styling or media
+    3: NetworkPolicy(ready_selector="article.seminar-event", ready_timeout=30000),
+}
@@ -0,0 +1,169 @@
+from datetime import datetime, timezone
+from pathlib import Path
+import re, json, hashlib, threading
+
+from date_normalizer import normalize_groups
+from dedup_index import entry_key
+from atomic_io import atomic_write
+
+def fill_missing(group):
+    """
+    Replace empty fields with "N/A" on a dumped SeminarFullyBaked dict (top level and entries).
+    """
+    for key, value in group.items():
+        if value == "":
+            group[key] = "N/A"
+    for entry in group.get("entries") or []:
+        for key, value in entry.items():
+            if value == "":
+                entry[key] = "N/A"
+    return group
+
+def collapse_cross_listed(groups):
+    """
+    Keep each cross-listed talk (same dedup key, see dedup_index.py) once, in the first series that
+    lists it, with a `cross_listed` list of the other departments/series that list it too.
+    Later copies are removed. Returns the number of copies removed.
+    """
+    first = {}
+    removed = 0
+    for group in groups:
+        listing = {"department": group["department"], "series": group["series"]}
+        kept = []
+        for entry in group["entries"]:
+            key = entry_key(entry)
+            if key is None:
+                kept.append(entry)
+                continue
+            if key not in first:
+                first[key] = (entry, listing)
+                kept.append(entry)
+                continue
+            removed += 1
+            owner, owner_listing = first[key]
+            cross_listed = owner.setdefault("cross_listed", [])
+            if listing != owner_listing and listing not in cross_listed:
+                cross_listed.append(listing)
+        group["entries"] = kept
+    return removed
+
+def date_range(entries):
+    """
+    (first, last) normalized ISO dates of the entries, or (None, None).
+    """
+    dates = [entry["date_iso"] for entry in entries if entry.get("date_iso")]
+    if not dates:
+        return None, None
+    return min(dates), max(dates)
+
+def _slug(text):
+    return re.sub(r'[^a-z0-9]+', '-', str(text).lower()).strip('-') or "unnamed"
+
+class OutputWriter:
+    """
+    Streams each department/series to its own compact JSON shard as soon as its row finishes, then
+    writes a manifest (entry counts, date ranges, content hashes) and the combined seminars.json.
+    Entries get normalized dates/epochs (date_normalizer.py) and are sorted and window-filtered first.
+
+    Layout under `directory`:
+        seminars.json                      every series, each cross-listed talk once
+        seminars/manifest.json             index of the shards below
+        seminars/<department>--<series>.json
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.shard_dir = self.directory / "seminars"
+        self.manifest_path = self.shard_dir / "manifest.json"
+        self.shards = {}
+        self._dedup_keys = {}
+        self._lock = threading.Lock()
+
+    def _shard_file(self, department, series):
+        name = f"{_slug(department)}--{_slug(series)}.json"
+        taken = {shard["file"] for key, shard in self.shards.items() if key != (department, series)}
+        number = 2
+        while name in taken:
+            name = f"{_slug(department)}--{_slug(series)}-{number}.json"
+            number += 1
+        return name
+
+    def write_shard(self, seminar):
+        """
+        Write one SeminarFullyBaked to its shard and remember it for the manifest.
+        """
+        group = fill_missing(normalize_groups([seminar.model_dump()])[0])
+        text = json.dumps(group, separators=(",", ":"))
+        first, last = date_range(group["entries"])
+
+        with self._lock:
+            key = (group["department"], group["series"])
+            name = self._shard_file(*key)
+            atomic_write(self.shard_dir / name, text)
+            self._dedup_keys[key] = {entry_key(entry) for entry in group["entries"]} - {None}
+            self.shards[key] = {
+                "department": group["department"],
+                "series": group["series"],
+                "file": name,
+                "entries": len(group["entries"]),
+                "first_date": first,
+                "last_date": last,
+                "sha256": hashlib.sha256(text.encode("utf-8")).hexdigest(),
+                "bytes": len(text.encode("utf-8")),
+            }
+        return self.shard_dir / name
+
+    def retain(self, seminars):
+        """
+        Forget the shards of series not in `seminars` (e.g. a source whose window emptied since it was
+        last written), so the next write_manifest drops them and deletes their files.
+        """
+        keep = {(group["department"], group["series"]) for group in (fill_missing({"department": seminar.department, "series": seminar.series}) for seminar in seminars)}
+        with self._lock:
+            for key in set(self.shards) - keep:
+                del self.shards[key]
+                self._dedup_keys.pop(key, None)
+
+    def write_manifest(self, run_id=None):
+        """
+        Index every shard written this run and delete shards left over from series that are gone.
+        """
+        with self._lock:
+            shards = sorted(self.shards.values(), key=lambda shard: (shard["department"], shard["series"]))
+            seen, cross_listed = set(), set()
+            for keys in self._dedup_keys.values():
+                cross_listed |= seen & keys
+                seen |= keys
+        firsts = [shard["first_date"] for shard in shards if shard["first_date"]]
+        lasts = [shard["last_date"] for shard in shards if shard["last_date"]]
+        manifest = {
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "run_id": run_id,
+            "series": len(shards),
+            "entries": sum(shard["entries"] for shard in shards),
+            "cross_listed": len(cross_listed),
+            "first_date": min(firsts) if firsts else None,
+            "last_date": max(lasts) if lasts else None,
+            "shards": shards,
+        }
+        atomic_write(self.manifest_path, json.dumps(manifest, indent=2))
+
+        # Only after the new manifest is in place, so a reader never sees it point at a missing shard
+        current = {shard["file"] for shard in shards} | {self.manifest_path.name}
+        for path in self.shard_dir.glob("*.json"):
+            if path.name not in current:
+                path.unlink()
+        return self.manifest_path
+
+    def write_combined(self, seminars):
+        """
+        The single seminars.json the liontalk frontend imports today. A talk listed by several series
+        appears once, in the first of them, and names the others in `cross_listed`.
+        """
+        path = self.directory / "seminars.json"
+        groups = [fill_missing(group) for group in normalize_groups([seminar.model_dump() for seminar in seminars])]
+        removed = collapse_cross_listed(groups)
+        if removed:
+            print(f"Collapsed {removed} cross-listed copies in {path.name}")
+        atomic_write(path, json.dumps(groups, indent=2))
+        return path
@@ -0,0 +1,236 @@
+from bs4 import BeautifulSoup
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urljoin
+import re
+
+from html_backend import get_backend
+from extractors import is_confident, event_hint
+from dedup_index import dedup_key
+from html_minimizer import minimize_html
+
+# CPU-bound page parsing for the scrape methods. Everything here takes and returns plain
+# strings/dicts so it can run in ParsePipeline's worker processes.
+
+def _children(node):
+    return [child for child in node.children if getattr(child, 'name', None) or str(child).strip()]
+
+def _boundary(children):
+    """
+    (is_boundary, keep_boundary) for a list of sibling nodes, or None if they have no <hr>/heading separators.
+    """
+    if any(getattr(child, 'name', None) == 'hr' for child in children):
+        return (lambda child: child.name == 'hr'), False
+    if any(getattr(child, 'name', None) in ('h2', 'h3', 'h4') for child in children):
+        return (lambda child: child.name in ('h2', 'h3', 'h4')), True
+    return None
+
+def split_event_blocks(container):
+    """
+    Split a seminar listing into one chunk of HTML per event.
+    Pages separate events with <hr>, or start each one with a heading; otherwise each top-level element is an event.
+    Wrappers holding a single element (e.g. <div class="entry-content">) are looked through for those separators.
+    """
+    children = _children(container)
+
+    inner_children = children
+    while len(inner_children) == 1 and getattr(inner_children[0], 'name', None):
+        inner_children = _children(inner_children[0])
+    boundary = _boundary(inner_children)
+    if boundary is not None:
+        children = inner_children
+    else:
+        # No separators at any level: one event per top-level element (a lone wrapper stays one block)
+        return [str(child) for child in children if getattr(child, 'name', None) and child.get_text(strip=True)]
+    is_boundary, keep_boundary = boundary
+
+    blocks, current = [], []
+    for child in children:
+        if getattr(child, 'name', None) and is_boundary(child):
+            if current:
+                blocks.append(current)
+            current = [child] if keep_boundary else []
+        else:
+            current.append(child)
+    if current:
+        blocks.append(current)
+
+    blocks = ["".join(str(part) for part in block) for block in blocks]
+    return [block for block in blocks if BeautifulSoup(block, 'html.parser').get_text(strip=True)]
+
+def parse_stat_page(html):
+    """
+    scrape_1: sanitize the #seminar-content HTML and split it into event blocks.
+    Returns (sanitized_html, blocks).
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # Sanitize HTML before sending to Gemini
+    for strong_tag in soup.find_all('strong'):
+        strong_tag.unwrap()
+
+    return str(soup), split_event_blocks(soup)
+
+# --- SCRAPE_2 SELECTORS: compiled once for the configured HTML backend ---
+html_backend = get_backend()
+SELECTORS = {name: html_backend.compile(css) for name, css in {
+    "view_content": "div.view-content",
+    "article": "article.cu-event",
+    "event_time": "div.event-time",
+    "link": "a[href]",
+    "title": "span.field--name-title",
+    # Explicit Drupal field first, then any div whose class mentions it
+    "location": 'div[class*="field--name-field-event-location"]',
+    "location_fallback": 'div[class*="location" i]',
+    "speaker": 'div[class*="field--name-field-speaker"]',
+    "speaker_fallback": 'div[class*="speaker" i]',
+    "body": "div.field--name-body",
+    "body_fallback": "div.region-content",
+}.items()}
+
+# Abstract/bio separators, most specific first. One pass over the body finds all of them.
+BIO_MARKERS = ("about", "bio", "biography")
+BIO_SPLIT_RE = re.compile(r'(?P<about>about\s+the\s+speaker)|(?P<bio>\bbio:)|(?P<biography>\bbiography)', re.IGNORECASE)
+
+def split_abstract_bio(full_text):
+    """
+    Split detail page body text into (abstract, bio) on the most specific marker present.
+    """
+    first = {}
+    for match in BIO_SPLIT_RE.finditer(full_text):
+        first.setdefault(match.lastgroup, match)
+    for marker in BIO_MARKERS:
+        if marker in first:
+            match = first[marker]
+            return full_text[:match.start()].strip(), full_text[match.end():].strip()
+    # Fallback: Everything is abstract
+    return full_text, "Not detected in text"
+
+def parse_event_detail(event, html):
+    """
+    Fill in location, speaker, abstract, bio and display date/time on a scrape_2 event dict from its detail page HTML.
+    """
+    root = html_backend.parse(html)
+
+    def first(*names):
+        for name in names:
+            node = html_backend.select_one(root, SELECTORS[name])
+            if node is not None:
+                return node
+        return None
+
+    # --- PARSING LOGIC (Based on Drupal Structure) ---
+    loc_div = first("location", "location_fallback")
+    event['location'] = html_backend.text(loc_div) if loc_div is not None else "Location not specified"
+
+    speaker_div = first("speaker", "speaker_fallback")
+    event['speaker'] = html_backend.text(speaker_div) if speaker_div is not None else "See Abstract"
+
+    # Drupal puts abstract + bio + affiliation in 'field--name-body'; otherwise grab the main content region
+    body_div = first("body", "body_fallback")
+    full_text = html_backend.text(body_div, "\n") if body_div is not None else ""
+
+    # --- INTELLIGENT SPLITTING ---
+    event['abstract'], event['speaker_bio'] = split_abstract_bio(full_text)
+
+    # Add date_display and time_display for Gemini (Columbia = Eastern)
+    try:
+        ts = event["start_timestamp"]
+        eastern = timezone(timedelta(hours=-5))
+        dt = datetime.fromtimestamp(ts, tz=eastern)
+        event["date_display"] = dt.strftime("%d-%b-%y")
+        h, m = dt.hour, dt.minute
+        event["time_display"] = f"{h % 12 or 12}:{m:02d} {'AM' if h < 12 else 'PM'}"
+    except (ValueError, OSError, KeyError):
+        event["date_display"] = ""
+        event["time_display"] = ""
+    return event
+
+def parse_listing(html, link, now_ts, end_ts, department, series):
+    """
+    scrape_2: the events on a Drupal calendar listing that start inside [now_ts, end_ts].
+    Returns (events, ISO dates of the events after end_ts), or (None, []) if the page has no event list.
+    """
+    root = html_backend.parse(html)
+    view_content = html_backend.select_one(root, SELECTORS["view_content"])
+    if view_content is None:
+        return None, []
+
+    events, later = [], []
+    for article in html_backend.select(view_content, SELECTORS["article"]):
+        # A. Get Timestamp (Fast & Reliable attribute)
+        time_div = html_backend.select_one(article, SELECTORS["event_time"])
+        start_time = html_backend.attr(time_div, 'data-start-time') if time_div is not None else None
+        if start_time is None:
+            continue
+
+        try:
+            event_ts = int(start_time)
+        except ValueError:
+            continue
+
+        # B. Date Filter
+        if event_ts > end_ts:
+            later.append(datetime.fromtimestamp(event_ts).date().isoformat())
+        if not now_ts <= event_ts <= end_ts:
+            continue
+
+        # Get URL
+        link_tag = html_backend.select_one(article, SELECTORS["link"])
+        if link_tag is None:
+            continue
+        url = html_backend.attr(link_tag, 'href')
+        if url.startswith("/"):
+            url = urljoin(link, url)
+
+        # Get Title
+        title_tag = html_backend.select_one(article, SELECTORS["title"])
+        title = html_backend.text(title_tag) if title_tag is not None else "No Title"
+
+        events.append({
+            "title": title,
+            "url": url,
+            "start_timestamp": event_ts,
+            "department": department,
+            "series": series
+        })
+    return events, later
+
+def parse_spa_page(html):
+    """
+    scrape_3: keep only the event cards; long calendars are chunked later instead of truncated.
+    Returns (minimal_html, articles).
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    articles = [str(article) for article in soup.find_all('article', class_='seminar-event')]
+
+    # Rebuild a minimal HTML structure with only the events
+    new_soup = BeautifulSoup("<html><body><section id='events'>" + "".join(articles) + "</section></body></html>", "html.parser")
+    return str(new_soup), articles
+
+def prepare_events(events, rule, dedup):
+    """
+    Everything extraction needs from each event before Gemini, so none of the parsing happens on the event loop.
+    Returns one (entry, dedup key, gemini payload) per event: `entry` is the confident rule result as a dict
+    (key and payload are then None), otherwise `key` is the cross-series dedup key (or None) and `payload`
+    is the minimized HTML block or the event dict itself.
+    """
+    prepared = []
+    for event in events:
+        entry = None
+        if rule is not None:
+            try:
+                entry = rule(event)
+            except Exception as e:
+                print(f"Rule-based extraction error, falling back to Gemini: {e}")
+        if is_confident(entry):
+            prepared.append((entry.model_dump(), None, None))
+            continue
+
+        key = None
+        if dedup:
+            try:
+                key = dedup_key(*event_hint(event))
+            except Exception as e:
+                print(f"Could not build dedup key, extracting without dedup: {e}")
+        prepared.append((None, key, minimize_html(event) if isinstance(event, str) else event))
+    return prepared
@@ -0,0 +1,116 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import os, asyncio, multiprocessing
+
+from metrics import tracer
+
+# Worker processes for parsing. Defaults to one less than the core count, leaving a core for the event loop and Chromium.
+# 0 parses inline on the event loop (the default on single-core hosts, and handy with a debugger).
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(max(0, (os.cpu_count() or 1) - 1))))
+# Raw pages waiting to be parsed; fetchers block once this many are queued
+PARSE_QUEUE_SIZE = int(os.getenv("PARSE_QUEUE_SIZE", str(max(4, 2 * PARSE_WORKERS))))
+
+def _ready():
+    return os.getpid()
+
+def _mp_context():
+    # Workers come from a clean forkserver process, never forked from this one, so it doesn't matter
+    # whether the browser, Gemini or status API threads exist yet (fork + threads can deadlock)
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return None
+
+class ParsePipeline:
+    """
+    Producer/consumer stage between the browser and Gemini.
+
+    Scrapers release their page and `await pipeline.run(fn, *args)` with the raw HTML. Jobs go onto a
+    bounded queue, and one consumer per worker process feeds them into a process pool, so the browser
+    keeps navigating while other cores parse. A full queue makes `run` wait, which keeps the number of
+    raw pages held in memory bounded.
+
+    `fn` must be a module-level function (see page_parsers.py) taking and returning picklable values.
+    """
+
+    def __init__(self, workers=None, queue_size=None):
+        self.workers = PARSE_WORKERS if workers is None else workers
+        self.queue_size = queue_size or PARSE_QUEUE_SIZE
+        self._executor = None
+        self._queue = None
+        self._consumers = []
+        self.metrics = {"jobs": 0, "failed": 0, "max_queued": 0, "restarts": 0}
+
+    def _start_executor(self):
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=_mp_context())
+
+    async def __aenter__(self):
+        if self.workers > 0:
+            self._start_executor()
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            loop = asyncio.get_running_loop()
+            # Start every worker now so the first pages don't wait for worker start-up
+            await asyncio.gather(*(loop.run_in_executor(self._executor, _ready) for _ in range(self.workers)))
+            self._consumers = [asyncio.create_task(self._consume()) for _ in range(self.workers)]
+            print(f"Parse pipeline started with {self.workers} worker process(es), queue size {self.queue_size}")
+        return self
+
+    async def __aexit__(self, *exc):
+        for consumer in self._consumers:
+            consumer.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        self._consumers = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def _consume(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            fn, args, future = await self._queue.get()
+            executor = self._executor
+            try:
+                if not future.cancelled():
+                    result = await loop.run_in_executor(executor, fn, *args)
+                    if not future.cancelled():
+                        future.set_result(result)
+            except BrokenProcessPool as e:
+                # A worker died (e.g. OOM-killed). Replace the pool once, so later jobs don't all fail
+                # for the life of a long-running process; this job fails and its row is retried later.
+                if self._executor is executor:
+                    print(f"Parse worker died, restarting the process pool: {e}")
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    self._start_executor()
+                    self.metrics["restarts"] += 1
+                if not future.done():
+                    future.set_exception(e)
+            except asyncio.CancelledError:
+                if not future.done():
+                    future.cancel()
+                raise
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self._queue.task_done()
+
+    async def run(self, fn, *args):
+        """
+        Queue fn(*args) for a worker process and wait for its result (exceptions are re-raised here).
+        """
+        self.metrics["jobs"] += 1
+        try:
+            if self._executor is None:
+                return fn(*args)
+
+            future = asyncio.get_running_loop().create_future()
+            # Backpressure: waits here while the queue is full
+            with tracer.span("parse_queue_wait", queued=self._queue.qsize()):
+                await self._queue.put((fn, args, future))
+            self.metrics["max_queued"] = max(self.metrics["max_queued"], self._queue.qsize())
+            return await future
+        except Exception:
+            self.metrics["failed"] += 1
+            raise
+
+    def stats(self):
+        return {"workers": self.workers, "queue_size": self.queue_size, **self.metrics}
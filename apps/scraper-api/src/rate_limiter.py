@@ -0,0 +1,192 @@
+import os, re, time, random, threading
+
+from metrics import tracer
+
+class CircuitOpenError(RuntimeError):
+    """
+    Raised instead of calling Gemini while the circuit breaker is open.
+    """
+
+# Retry hints come back either as a RetryInfo detail ("retryDelay": "12s") or in the error message
+RETRY_DELAY_RE = re.compile(r"retry(?:Delay|[ _]in)['\"]?\s*[:=]?\s*['\"]?(\d+(?:\.\d+)?)\s*s", re.IGNORECASE)
+
+def classify_error(error):
+    """
+    Returns (retryable, retry_after_seconds or None) for an exception raised by the Gemini client.
+    """
+    code = getattr(error, "code", None) or getattr(error, "status_code", None)
+    message = str(error)
+    if code is None:
+        # Fall back to string matching for errors that don't carry a status code
+        match = re.search(r"\b(429|500|502|503|504)\b", message)
+        code = int(match.group(1)) if match else None
+
+    retryable = code in (429, 500, 502, 503, 504)
+    hint = RETRY_DELAY_RE.search(message)
+    return retryable, float(hint.group(1)) if hint else None
+
+class TokenBucket:
+    """
+    Refills `per_minute` units per minute. Callers reserve units and get back how long to wait for them.
+    """
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def reserve(self, amount, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        # A single request bigger than the bucket would wait forever, so cap it
+        self.tokens -= min(amount, self.capacity)
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+class GeminiRateLimiter:
+    """
+    One throttle shared by every Gemini call in the process (parse_html runs in worker threads).
+
+    - Token buckets for requests/minute and tokens/minute
+    - Server retry hints pause *all* callers, not just the one that got the 429
+    - Requests/minute halves on each 429 and creeps back up on success (AIMD)
+    - A circuit breaker fails fast after repeated overload errors until a cooldown has passed
+    """
+
+    def __init__(self, rpm=None, tpm=None, max_retries=None, failure_threshold=None, cooldown=None):
+        self.max_rpm = rpm or int(os.getenv("GEMINI_RPM", "15"))
+        self.max_retries = max_retries or int(os.getenv("GEMINI_MAX_RETRIES", "5"))
+        self.failure_threshold = failure_threshold or int(os.getenv("GEMINI_CIRCUIT_FAILURES", "5"))
+        self.cooldown = cooldown or float(os.getenv("GEMINI_CIRCUIT_COOLDOWN", "60"))
+        self.base_delay = 2  # Start with 2 seconds wait
+
+        self.requests = TokenBucket(self.max_rpm)
+        self.tokens = TokenBucket(tpm or int(os.getenv("GEMINI_TPM", "250000")))
+        self.paused_until = 0.0
+
+        self.circuit = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+
+        self._lock = threading.Lock()
+        self.metrics = {
+            "calls": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "queued": 0,          # Calls that had to wait for the buckets or a server pause
+            "queued_seconds": 0.0,
+            "retried": 0,
+            "throttled": 0,       # 429 responses
+            "rejected": 0,        # Failed fast because the circuit was open
+        }
+
+    def call(self, fn, tokens=0, requests=1):
+        """
+        Run `fn` under the shared limits, retrying overload errors with backoff.
+        """
+        with self._lock:
+            self.metrics["calls"] += 1
+
+        for attempt in range(self.max_retries):
+            is_probe = self._admit(tokens, requests)
+            try:
+                result = fn()
+            except Exception as e:
+                retryable, retry_after = classify_error(e)
+                if not retryable:
+                    # e.g. invalid API key or bad request: retrying won't help
+                    self._finish(is_probe, success=False, overloaded=False)
+                    with self._lock:
+                        self.metrics["failed"] += 1
+                    raise
+
+                self._finish(is_probe, success=False, overloaded=True, throttled="429" in str(e) or getattr(e, "code", None) == 429)
+                if attempt == self.max_retries - 1:
+                    print(f"Max retries reached. Failing with error: {e}")
+                    with self._lock:
+                        self.metrics["failed"] += 1
+                    raise
+
+                # Honor the server's hint, otherwise exponential backoff: 2s, 4s, 8s... + random jitter
+                sleep_time = retry_after if retry_after is not None else (self.base_delay * (2 ** attempt)) + random.uniform(0.1, 1.0)
+                with self._lock:
+                    self.metrics["retried"] += 1
+                    self.paused_until = max(self.paused_until, time.monotonic() + sleep_time)
+                tracer.event("gemini_retry", attempt=attempt + 1, delay_seconds=round(sleep_time, 2), error=str(e)[:200])
+                print(f"Gemini overloaded (Attempt {attempt+1}/{self.max_retries}). Pausing Gemini calls for {sleep_time:.2f}s...")
+                continue
+
+            self._finish(is_probe, success=True, overloaded=False)
+            with self._lock:
+                self.metrics["succeeded"] += 1
+            return result
+
+    def _admit(self, tokens, requests):
+        """
+        Check the circuit, then wait for the buckets and any server-requested pause. Returns True for a half-open probe.
+        """
+        with self._lock:
+            now = time.monotonic()
+            is_probe = False
+            if self.circuit == "open":
+                if now - self.opened_at < self.cooldown or self.probe_in_flight:
+                    self.metrics["rejected"] += 1
+                    tracer.event("gemini_rejected")
+                    raise CircuitOpenError(f"Gemini circuit open after {self.consecutive_failures} consecutive failures; failing fast")
+                # Cooldown over: let exactly one call through to test the API
+                self.probe_in_flight = True
+                is_probe = True
+
+            wait = max(
+                self.requests.reserve(requests, now) if requests else 0.0,
+                self.tokens.reserve(tokens, now) if tokens else 0.0,
+                self.paused_until - now,
+            )
+            if wait > 0:
+                self.metrics["queued"] += 1
+                self.metrics["queued_seconds"] += wait
+
+        if wait > 0:
+            with tracer.span("gemini_queue_wait", seconds=round(wait, 2)):
+                time.sleep(wait)
+        return is_probe
+
+    def _finish(self, is_probe, success, overloaded, throttled=False):
+        with self._lock:
+            if is_probe:
+                self.probe_in_flight = False
+
+            if success:
+                self.consecutive_failures = 0
+                self.circuit = "closed"
+                # Additive increase back towards the configured rate
+                self._set_rpm(min(self.max_rpm, self.requests.capacity + 1))
+                return
+
+            if throttled:
+                self.metrics["throttled"] += 1
+                # Multiplicative decrease so concurrent callers stop piling on
+                self._set_rpm(max(1, self.requests.capacity / 2))
+
+            if overloaded:
+                self.consecutive_failures += 1
+                if is_probe or self.consecutive_failures >= self.failure_threshold:
+                    if self.circuit != "open":
+                        print(f"Gemini circuit opened after {self.consecutive_failures} consecutive failures")
+                    self.circuit = "open"
+                    self.opened_at = time.monotonic()
+
+    def _set_rpm(self, rpm):
+        self.requests.capacity = rpm
+        self.requests.rate = rpm / 60.0
+        self.requests.tokens = min(self.requests.tokens, rpm)
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self.metrics,
+                "queued_seconds": round(self.metrics["queued_seconds"], 2),
+                "current_rpm": round(self.requests.capacity, 1),
+                "circuit": self.circuit,
+            }
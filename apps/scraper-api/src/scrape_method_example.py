@@ -1,4 +1,4 @@
-def scrape_N(link, department, series):
+async def scrape_N(link, department, series, pool, pipeline, window):
     """
     Scrape method N for [describe the website format].
     
@@ -6,46 +6,58 @@ def scrape_N(link, department, series):
         link: URL of the seminar page
         department: Department name from CSV
         series: Series name from CSV
+        pool: Shared BrowserPool to borrow a page from
+        pipeline: Shared ParsePipeline that parses HTML on worker processes
+        window: DateWindow for this row (date_window.py); pass per-event blocks through apply_window()
     
     Returns:
         SeminarFullyBaked object or None if scraping fails
     """
-    with sync_playwright() as p:
-        is_headless = os.getenv("HEADLESS", "true").lower() == "true"
-        browser = p.chromium.launch(headless=is_headless, slow_mo=50)
-        
-        context = browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        )
-        page = context.new_page()
+    source_path, screenshot_path = source_paths(department, series)
+
+    # Add a NetworkPolicy for method N to NETWORK_POLICIES in network_policy.py:
+    # which resources to block, and the selector that means the page is ready
+    policy = NETWORK_POLICIES[N]
+
+    # Borrow a warm page from the shared browser pool (see browser_pool.py)
+    async with pool.page(policy) as page:
         
         try:
             print("Navigating to URL...")
-            page.goto(link, wait_until="networkidle", timeout=60000)
+            await page.goto(link, wait_until="domcontentloaded")
             
             print("Waiting for content...")
+            await policy.wait_ready(page)
             
             # Replace '#your-selector' with the selector you found
-            html = page.locator('#your-selector').inner_html()
-            soup = BeautifulSoup(html, 'html.parser')
-            
-            # Optional: Sanitize HTML if needed
-            # Remove unwanted tags that might confuse Gemini
-            for strong_tag in soup.find_all('strong'):
-                strong_tag.unwrap()
-            # Add more sanitization as needed
-            
-            with open('source.html', 'wb') as f:
-                f.write(soup.encode('utf-8'))
-            
-            print(f"HTML written to source.html...")
+            html = await page.locator('#your-selector').inner_html()
         
         except Exception as e:
             print(f"Scraping failed: {e}")
-            page.screenshot(path="debug_error.png")
-            print("Screenshot saved to debug_error.png")
-            browser.close()
+            await page.screenshot(path=str(screenshot_path))
+            print(f"Screenshot saved to {screenshot_path}")
             return None
-        
-        browser.close()
-        return parse_html("./source.html", department, series)
\ No newline at end of file
+
+    # Parse, sanitize and split into one block per event on a worker process once the page is back in the pool.
+    # Write parse_N(html) in page_parsers.py: plain strings in, plain strings out, e.g.
+    #
+    #     def parse_N(html):
+    #         soup = BeautifulSoup(html, 'html.parser')
+    #         # Remove unwanted tags that might confuse Gemini
+    #         for strong_tag in soup.find_all('strong'):
+    #             strong_tag.unwrap()
+    #         return str(soup), split_event_blocks(soup)
+    sanitized_html, blocks = await pipeline.run(parse_N, html)
+
+    with open(source_path, 'w', encoding='utf-8') as f:
+        f.write(sanitized_html)
+
+    print(f"HTML written to {source_path}...")
+
+    # Drop events outside the row's date window before anything reaches Gemini
+    blocks = await apply_window(blocks, window, pipeline)
+
+    # Rule-based extraction first; only blocks the rules can't handle go to Gemini (off the event loop)
+    if INCREMENTAL:
+        return await extract_incremental(blocks, department, series, entry_from_html_block, pipeline)
+    return await extract_with_rules(blocks, department, series, entry_from_html_block, pipeline)
@@ -1,47 +1,93 @@
-from playwright.sync_api import sync_playwright
-from bs4 import BeautifulSoup
 from google import genai
-from dotenv import load_dotenv
-from pydantic import BaseModel, Field
-from typing import List, Optional, Union
+from typing import Union
 from pathlib import Path
-from urllib.parse import urlparse, urljoin
-from datetime import datetime, timedelta, timezone
-import os, csv, pandas as pd, json, re, time, random
-
-class Entry(BaseModel):
-    seminar_title: str = Field(description="The title of the seminar.")
-    date: str = Field(description="Date of the seminar in dd-MMM-yy format.")
-    location: str = Field(description="Building location.")
-    time: str = Field(description="Time of the seminar.")
-    speaker: str = Field(description="Name of the speaker.")
-    affiliation: str = Field(description="Speaker's affiliated school or organization.")
-    abstract: str = Field(description="Brief detail overview of the seminar topic.")
-    bio: str = Field(description="Information about the speaker.")
-
-class SeminarHalfBaked(BaseModel):
+from urllib.parse import urlparse
+import os, sys, pandas as pd, json, re, asyncio, requests, threading
+
+from browser_pool import BrowserPool, USER_AGENT
+from llm_cache import LLMCache
+from event_store import EventIndex, fingerprint
+from source_state import SourceState, source_key
+from models import Entry, SeminarHalfBaked, SeminarFullyBaked
+from extractors import entry_from_event, entry_from_html_block
+from dedup_index import DedupIndex, entry_key
+from html_minimizer import estimate_tokens, chunk_blocks
+from rate_limiter import GeminiRateLimiter
+from network_policy import NETWORK_POLICIES
+from metrics import tracer
+from output_writer import OutputWriter
+from parse_pipeline import ParsePipeline
+from checkpoint import RunJournal, input_hash, row_key
+from date_window import DATE_WINDOW, row_window, filter_window
+from page_parsers import parse_stat_page, parse_listing, parse_event_detail, parse_spa_page, prepare_events
+
+GEMINI_MODEL = "gemini-2.5-flash-lite"
+
+# One throttle and one client shared by every extraction call
+gemini_limiter = GeminiRateLimiter()
+_gemini_client = None
+_gemini_client_lock = threading.Lock()
+
+def get_gemini_client():
     """
-    Intermediate schema for Gemini processing.
-    'HalfBaked' implies this data is raw from the LLM and missing external metadata (department, series).
+    Create the Gemini client once per process instead of once per parse_html call.
     """
-    entries: List[Entry]
-
-class SeminarFullyBaked(BaseModel):
+    global _gemini_client
+    with _gemini_client_lock:
+        if _gemini_client is None:
+            api_key = os.environ.get("GEMINI_API_KEY")
+            if not api_key:
+                raise ValueError("GEMINI_API_KEY not found in environment!")
+            _gemini_client = genai.Client(api_key=api_key)
+        return _gemini_client
+
+def request_gemini(source, prompt, schema):
     """
-    Final schema for output.
-    'FullyBaked' implies the data is complete, combining LLM extraction with CSV metadata.
+    Send one extraction request to Gemini and validate the response into SeminarHalfBaked.
     """
-    department: str
-    series: str
-    entries: List[Entry]
+    client = get_gemini_client()
 
-def parse_html(source: Union[str, list], department: str, series: str):
-    api_key = os.environ.get("GEMINI_API_KEY")
-    if not api_key:
-        raise ValueError("GEMINI_API_KEY not found in environment!")
+    if isinstance(source, list):
+        contents = [prompt]
+        estimated_tokens = estimate_tokens(prompt)
+    else:
+        # Uploads go through the limiter for retries and the circuit breaker, but don't use up generate_content quota
+        with tracer.span("file_upload"):
+            myfile = gemini_limiter.call(lambda: client.files.upload(file=source), requests=0)
+        contents = [prompt, myfile]
+        estimated_tokens = estimate_tokens(prompt) + os.path.getsize(source) // 4
+
+    print("Retrieving response from Gemini...")
 
-    client = genai.Client(api_key=api_key)
+    def generate():
+        # One span per attempt, so retries show up as separate Gemini latencies
+        with tracer.span("gemini_generate", model=GEMINI_MODEL):
+            return client.models.generate_content(
+                model=GEMINI_MODEL,
+                contents=contents,
+                config={
+                    "response_mime_type": "application/json",
+                    "response_json_schema": schema,
+                },
+            )
 
+    with tracer.span("gemini_request", estimated_input_tokens=estimated_tokens):
+        response = gemini_limiter.call(generate, tokens=estimated_tokens)
+
+    usage = getattr(response, "usage_metadata", None)
+    tracer.event(
+        "gemini_tokens",
+        input_tokens=getattr(usage, "prompt_token_count", None),
+        output_tokens=getattr(usage, "candidates_token_count", None),
+        estimated_input_tokens=estimated_tokens,
+    )
+
+    print(f"Parsing Gemini response...")
+    # Validate the raw response using the HalfBaked model
+    with tracer.span("validate"):
+        return SeminarHalfBaked.model_validate_json(response.text)
+
+def parse_html(source: Union[str, list], department: str, series: str):
     if isinstance(source, list):
         # Pass events as JSON in the prompt (no file upload)
         prompt = (
@@ -51,7 +97,7 @@ def parse_html(source: Union[str, list], department: str, series: str):
             "For date and time use the event's date_display and time_display when present; otherwise use empty string.\n\n"
             + json.dumps(source, indent=2)
         )
-        contents = [prompt]
+        normalized_input = json.dumps(source, sort_keys=True)
     else:
         # File path: upload HTML and use existing prompt
         prompt = (
@@ -62,49 +108,36 @@ def parse_html(source: Union[str, list], department: str, series: str):
         if not os.path.exists(source):
             print("Error: source file was not created.")
             return None
-        myfile = client.files.upload(file=source)
-        contents = [prompt, myfile]
-
-    print("Retrieving response from Gemini...")
-
-    # --- RETRY LOGIC for Gemini API 503 Error ---
-    response = None
-    max_retries = 5
-    base_delay = 2  # Start with 2 seconds wait
-
-    for attempt in range(max_retries):
+        with open(source, encoding='utf-8') as f:
+            normalized_input = " ".join(f.read().split()) # Whitespace-only changes shouldn't bust the cache
+
+    # --- CACHE LOOKUP: skip Gemini entirely if this exact input was already extracted ---
+    schema = SeminarHalfBaked.model_json_schema()
+    cache_key = LLMCache.make_key(normalized_input, prompt, GEMINI_MODEL, schema)
+    cached = llm_cache.get(cache_key)
+    tracer.event("llm_cache", hit=cached is not None)
+    if cached is not None:
         try:
-            response = client.models.generate_content(
-                model="gemini-2.5-flash-lite", 
-                contents=contents,
-                config={
-                    "response_mime_type": "application/json",
-                    "response_json_schema": SeminarHalfBaked.model_json_schema(),
-                },
-            )
-            break # Success! Exit the loop.
-            
-        except Exception as e:
-            error_msg = str(e)
-            # Check for specific error codes: 503 (Unavailable) or 429 (Resource Exhausted)
-            if "503" in error_msg or "429" in error_msg:
-                if attempt == max_retries - 1:
-                    print(f"Max retries reached. Failing with error: {e}")
-                    raise e # Give up if we hit the limit
-                
-                # Exponential backoff: 2s, 4s, 8s... + random jitter
-                sleep_time = (base_delay * (2 ** attempt)) + random.uniform(0.1, 1.0)
-                print(f"Gemini overloaded (Attempt {attempt+1}/{max_retries}). Sleeping {sleep_time:.2f}s...")
-                time.sleep(sleep_time)
-            else:
-                # If it's a different error (e.g., Invalid API Key), crash immediately
-                raise e
-    # --- RETRY LOGIC ENDS HERE ---
+            half_baked_data = SeminarHalfBaked.model_validate_json(cached)
+            print("Using cached Gemini response...")
+        except ValueError:
+            llm_cache.delete(cache_key)
+            cached = None
+
+    # --- JOURNAL LOOKUP: an interrupted run already paid for this extraction ---
+    if cached is None and JOURNAL:
+        journaled = journal.extraction(cache_key)
+        if journaled is not None:
+            half_baked_data = SeminarHalfBaked.model_validate_json(journaled)
+            print("Using journaled Gemini response...")
+            cached = journaled
+
+    if cached is None:
+        half_baked_data = request_gemini(source, prompt, schema)
+        llm_cache.put(cache_key, half_baked_data.model_dump_json())
+        if JOURNAL:
+            journal.record_extraction(cache_key, half_baked_data.model_dump_json())
 
-    print(f"Parsing Gemini response...")
-    # Validate the raw response using the HalfBaked model
-    half_baked_data = SeminarHalfBaked.model_validate_json(response.text)
-    
     # Create the FullyBaked object by injecting department and series
     fully_baked_data = SeminarFullyBaked(
         department=department, 
@@ -115,268 +148,570 @@ def parse_html(source: Union[str, list], department: str, series: str):
     
     return fully_baked_data
 
-def scrape_1(link, department, series):
-    # Scrape HTML of specified website
-    with sync_playwright() as p:
+# --- CONCURRENCY SETTINGS ---
+# How many input.csv rows may be scraped at the same time, and how many of those may hit the same host
+MAX_CONCURRENCY = int(os.getenv("MAX_CONCURRENCY", "8"))
+MAX_PER_HOST = int(os.getenv("MAX_PER_HOST", "2"))
+
+# scrape_2 detail pages: how many load at once, and whether to try plain HTTP ("http") before the browser ("browser")
+DETAIL_CONCURRENCY = int(os.getenv("DETAIL_CONCURRENCY", "4"))
+DETAIL_FETCH = os.getenv("DETAIL_FETCH", "browser").lower()
+
+# --- INCREMENTAL SETTINGS ---
+# Only send new or changed events to Gemini and reuse the rest from the previous run
+INCREMENTAL = os.getenv("INCREMENTAL", "false").lower() == "true"
+EXTRACT_CONCURRENCY = int(os.getenv("EXTRACT_CONCURRENCY", "4"))
+STATE_DIR = Path(os.getenv("STATE_DIR", "/app/out/apps/scraper-api/state"))
+METRICS_DIR = Path(os.getenv("METRICS_DIR", "/app/out/apps/scraper-api/metrics"))
+# seminars.json plus one shard per series (seminars/<department>--<series>.json) and a manifest
+OUTPUT_DIR = Path(os.getenv("OUTPUT_DIR", "/app/out/apps/liontalk/src/data"))
+output_writer = OutputWriter(OUTPUT_DIR)
+
+# Rule-based fast path: well-structured events become entries without Gemini
+RULES = os.getenv("RULES", "true").lower() == "true"
+
+# HTML sent to Gemini is minimized, then split on event boundaries into chunks of at most this many tokens
+TOKEN_BUDGET = int(os.getenv("TOKEN_BUDGET", "8000"))
+
+# Cross-series dedup: a talk listed by several series (same title, date and speaker) goes to Gemini once
+DEDUP = os.getenv("DEDUP", "true").lower() == "true"
+dedup_index = DedupIndex()
+
+# Crash-safe journal of finished rows and Gemini results; an interrupted run resumes from it
+JOURNAL = os.getenv("JOURNAL", "true").lower() == "true"
+journal = RunJournal(STATE_DIR / "journal")
+event_index = EventIndex(STATE_DIR / "event_index.json")
+# Validated Gemini results keyed by a hash of input + prompt + model + schema; kept with the rest of the state
+llm_cache = LLMCache(os.getenv("LLM_CACHE_DIR", STATE_DIR / "llm_cache"))
+
+def source_paths(department, series, suffix=""):
+    """
+    Per-row scratch files so concurrent scrapes don't overwrite each other's source.html / debug_error.png.
+    Keyed on department and series, since the same series name can appear under several departments.
+    """
+    slug = "--".join(re.sub(r'[^a-z0-9]+', '-', str(part).lower()).strip('-') or "source" for part in (department, series, suffix) if part != "")
+    out_dir = Path("sources")
+    out_dir.mkdir(exist_ok=True)
+    return out_dir / f"{slug}.html", out_dir / f"{slug}-debug_error.png"
 
-        is_headless = os.getenv("HEADLESS", "true").lower() == "true"
-        browser = p.chromium.launch(headless=is_headless, slow_mo=50)
+async def prepare(events, rule, pipeline):
+    """
+    Rule entries, dedup keys and minimized HTML for `events`, computed on a parse worker (see page_parsers.prepare_events).
+    Returns one (Entry or None, dedup key or None, Gemini payload) per event.
+    """
+    with tracer.span("rule_extract", events=len(events)):
+        prepared = await pipeline.run(prepare_events, events, rule if RULES else None, DEDUP)
+    return [(Entry.model_validate(entry) if entry else None, key, payload) for entry, key, payload in prepared]
 
-        # Use a real browser Context + User Agent to avoid bot detection
-        context = browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        )
-        page = context.new_page()
+async def extract_html_blocks(blocks, department, series):
+    """
+    Extract minimized event blocks with Gemini. Over TOKEN_BUDGET they're split into chunks
+    (never mid-event) that are extracted in parallel and merged back in page order.
+    """
+    chunks = chunk_blocks(blocks, TOKEN_BUDGET)
+    total_tokens = sum(estimate_tokens(block) for block in blocks)
+    print(f"Minimized HTML to ~{total_tokens} tokens across {len(blocks)} events, {len(chunks)} chunk(s) for Gemini")
+
+    limit = asyncio.Semaphore(EXTRACT_CONCURRENCY)
+
+    async def extract_chunk(number, chunk):
+        source_path, _ = source_paths(department, series, f"chunk-{number}")
+        with open(source_path, 'w', encoding='utf-8') as f:
+            f.write("<html><body>" + "".join(chunk) + "</body></html>")
+        async with limit:
+            return await asyncio.to_thread(parse_html, str(source_path), department, series)
+
+    results = await asyncio.gather(*(extract_chunk(number, chunk) for number, chunk in enumerate(chunks)))
+    return [entry for seminar_data in results if seminar_data for entry in seminar_data.entries]
+
+async def extract_batch(payloads, positions, department, series):
+    """
+    Send payloads[positions] to Gemini in one batch. Returns {first position: entries}, or {} if nothing came back.
+    """
+    batch = [payloads[position] for position in positions]
+    if isinstance(batch[0], str):
+        gemini_entries = await extract_html_blocks(batch, department, series)
+    else:
+        seminar_data = await asyncio.to_thread(parse_html, batch, department, series)
+        gemini_entries = seminar_data.entries if seminar_data else []
+
+    # Gemini's entries slot in where the first event of the batch was
+    return {positions[0]: gemini_entries} if gemini_entries else {}
+
+async def extract_with_rules(events, department, series, rule, pipeline):
+    """
+    Extract confident events with `rule` and send only the leftovers to Gemini in a single batch.
+    """
+    if not events:
+        # Scraped fine but nothing in the window: an empty result, not a failure
+        return SeminarFullyBaked(department=department, series=series, entries=[])
+
+    prepared = await prepare(events, rule, pipeline)
+    entries_at = {position: [entry] for position, (entry, _, _) in enumerate(prepared) if entry is not None}
+    leftovers = [position for position, (entry, _, _) in enumerate(prepared) if entry is None]
+    payloads = [payload for _, _, payload in prepared]
+
+    if RULES and rule is not None:
+        print(f"Rule-based extraction: {len(entries_at)} of {len(events)} events parsed, {len(leftovers)} sent to Gemini")
+
+    if not leftovers:
+        pass
+    elif not DEDUP:
+        entries_at.update(await extract_batch(payloads, leftovers, department, series))
+    else:
+        # Claim each leftover in the cross-series index; talks another row already claimed are awaited instead
+        keys = {position: prepared[position][1] for position in leftovers}
+        own, waiting = [], []
+        for position in leftovers:
+            if keys[position] is None:
+                own.append(position)
+                continue
+            is_owner, owner_series, future = dedup_index.claim(keys[position], series)
+            if is_owner:
+                own.append(position)
+            else:
+                waiting.append((position, owner_series, future))
 
+        extracted = {}
         try:
-            print("Navigating to URL...")
-            page.goto(link, wait_until="domcontentloaded")
-            
-            print("Waiting for content...")
+            if own:
+                extracted = await extract_batch(payloads, own, department, series)
+                entries_at.update(extracted)
+        finally:
+            # Batched entries aren't tied to an event, so match them back to claimed keys by their own key
+            by_key = {entry_key(entry): [entry.model_dump()] for batch_entries in extracted.values() for entry in batch_entries}
+            for position in own:
+                if keys[position] is not None:
+                    dedup_index.resolve(keys[position], by_key.get(keys[position]))
+
+        fallbacks = []
+        for position, owner_series, future in waiting:
+            shared = await dedup_index.wait(future)
+            if shared:
+                print(f"Cross-listed event in {series} already extracted for {owner_series}, reusing it")
+                entries_at[position] = [Entry.model_validate(entry) for entry in shared]
+            else:
+                fallbacks.append(position)
+        if fallbacks:
+            entries_at.update(await extract_batch(payloads, fallbacks, department, series))
+
+    entries = [entry for position in sorted(entries_at) for entry in entries_at[position]]
+    if not entries:
+        return None
+    return SeminarFullyBaked(department=department, series=series, entries=entries)
 
-            html = page.locator('#seminar-content').inner_html()
-            soup = BeautifulSoup(html, 'html.parser')
+async def extract_event(payload, fp, department, series, limit):
+    """
+    Run Gemini on a single prepared event (minimized HTML chunk or scraped event dict). Returns None if extraction failed.
+    """
+    async with limit:
+        try:
+            if isinstance(payload, str):
+                source_path, _ = source_paths(department, series, fp[:12])
+                with open(source_path, 'w', encoding='utf-8') as f:
+                    f.write(payload)
+                seminar_data = await asyncio.to_thread(parse_html, str(source_path), department, series)
+            else:
+                seminar_data = await asyncio.to_thread(parse_html, [payload], department, series)
+        except Exception as e:
+            print(f"Extraction failed for event {fp[:12]} in {series}: {e}")
+            return None
+
+    if seminar_data is None:
+        return None
+    return [entry.model_dump() for entry in seminar_data.entries]
+
+async def extract_event_shared(prepared, fp, department, series, limit):
+    """
+    The entries of one prepared event: its rule entry, another row's extraction when the same talk is
+    cross-listed there, or extract_event.
+    """
+    entry, key, payload = prepared
+    if entry is not None:
+        return [entry.model_dump()]
+    if key is None:
+        return await extract_event(payload, fp, department, series, limit)
+
+    is_owner, owner_series, future = dedup_index.claim(key, series)
+    if not is_owner:
+        shared = await dedup_index.wait(future)
+        if shared:
+            print(f"Event {fp[:12]} in {series} is cross-listed with {owner_series}, reusing its extraction")
+            return shared
+        return await extract_event(payload, fp, department, series, limit)
+
+    entries = None
+    try:
+        entries = await extract_event(payload, fp, department, series, limit)
+    finally:
+        dedup_index.resolve(key, entries)
+    return entries
+
+async def extract_incremental(events, department, series, rule, pipeline):
+    """
+    Fingerprint each event, extract only the new/changed ones and merge with the previous run's entries.
+    `events` is a list of HTML chunks or scraped event dicts in page order.
+    """
+    if not events:
+        event_index.set(department, series, {})
+        return SeminarFullyBaked(department=department, series=series, entries=[])
+
+    previous = event_index.get(department, series)
+    fingerprints = [fingerprint(payload) for payload in events]
+
+    changed = {fp: payload for fp, payload in zip(fingerprints, events) if fp not in previous}
+    print(f"Incremental: {len(events) - len(changed)} unchanged, {len(changed)} new or changed events in {series}")
+
+    # Only the changed events are parsed for rules, dedup keys and minimized HTML
+    prepared = await prepare(list(changed.values()), rule, pipeline) if changed else []
+    limit = asyncio.Semaphore(EXTRACT_CONCURRENCY)
+    results = await asyncio.gather(*(extract_event_shared(item, fp, department, series, limit) for fp, item in zip(changed, prepared)))
+    extracted = {fp: entries for fp, entries in zip(changed, results) if entries is not None}
+
+    current = {}
+    entries = []
+    for fp in fingerprints:
+        block_entries = previous.get(fp, extracted.get(fp))
+        if block_entries is None:
+            continue # Failed this run, will be retried next run
+        current[fp] = block_entries
+        entries.extend(block_entries)
+
+    event_index.set(department, series, current)
+
+    if not entries:
+        return None
+    return SeminarFullyBaked(department=department, series=series, entries=entries)
 
-            # Sanitize HTML before sending to Gemini
-            for strong_tag in soup.find_all('strong'):
-                strong_tag.unwrap()
+async def apply_window(blocks, window, pipeline):
+    """
+    Drop event blocks dated outside the row's window (cheap DOM/text date hints) before they reach Gemini.
+    """
+    if not DATE_WINDOW or not blocks:
+        return blocks
+    with tracer.span("date_window", events=len(blocks)) as window_span:
+        kept, dropped, later = await pipeline.run(filter_window, blocks, window.start_ts, window.end_ts)
+        window_span["dropped"] = dropped
+    # Remembered with the result so the pre-check knows when a dropped event has come into the window
+    window.later_dates.extend(later)
+    print(f"Date window {window.first} to {window.last}: kept {len(kept)} of {len(blocks)} events")
+    return kept
+
+async def scrape_1(link, department, series, pool, pipeline, window):
+    source_path, screenshot_path = source_paths(department, series)
+
+    # Scrape HTML of specified website using a warm page from the shared browser pool
+    policy = NETWORK_POLICIES[1]
+    async with pool.page(policy) as page:
 
-            with open('source.html', 'wb') as f:
-                f.write(soup.encode('utf-8'))
+        try:
+            print("Navigating to URL...")
+            with tracer.span("navigate", url=link):
+                await page.goto(link, wait_until="domcontentloaded")
+            
+            print("Waiting for content...")
+            await policy.wait_ready(page)
 
-            print(f"HTML written to source.html...")
+            html = await page.locator('#seminar-content').inner_html()
         
         except Exception as e:
             # Add Screenshot debugging to see failure (e.g., CAPTCHA)
             print(f"Scraping failed: {e}")
-            page.screenshot(path="debug_error.png")
-            print("Screenshot saved to debug_error.png")
-            browser.close()
+            await page.screenshot(path=str(screenshot_path))
+            print(f"Screenshot saved to {screenshot_path}")
             return None
 
-        browser.close()
-        return parse_html("./source.html", department, series)
+    # The page is back in the pool; parse, sanitize and split into events on a worker process
+    with tracer.span("html_parse"):
+        sanitized_html, blocks = await pipeline.run(parse_stat_page, html)
 
-def scrape_2(link, department, series):
-    # 1. Define the Date Window (Now to +14 days)
-    now_ts = time.time()
-    end_ts = now_ts + (14 * 24 * 60 * 60)
-    
-    print(f"Filter Window: {datetime.fromtimestamp(now_ts).date()} to {datetime.fromtimestamp(end_ts).date()}")
+    with open(source_path, 'w', encoding='utf-8') as f:
+        f.write(sanitized_html)
 
-    events_data = []
+    print(f"HTML written to {source_path}...")
 
-    with sync_playwright() as p:
-        # Launch Browser (Headless for speed)
-        is_headless = os.getenv("HEADLESS", "true").lower() == "true"
-        browser = p.chromium.launch(headless=is_headless)
-        
-        context = browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        )
-        page = context.new_page()
+    # Past and far-off talks never reach Gemini, so prompt size follows the upcoming talks, not the archive
+    blocks = await apply_window(blocks, window, pipeline)
+
+    if INCREMENTAL:
+        return await extract_incremental(blocks, department, series, entry_from_html_block, pipeline)
+    return await extract_with_rules(blocks, department, series, entry_from_html_block, pipeline)
+
+def fetch_static_html(url):
+    """
+    Plain-HTTP fetch for server-rendered Drupal event pages.
+    Returns None when the page doesn't look server-rendered so the caller can fall back to the browser.
+    """
+    try:
+        response = requests.get(url, headers={"User-Agent": USER_AGENT}, timeout=15)
+    except requests.RequestException as e:
+        print(f"HTTP fetch failed for {url}: {e}")
+        return None
+
+    if response.status_code != 200:
+        return None
+    if 'field--name-body' not in response.text and 'region-content' not in response.text:
+        return None
+    return response.text
+
+async def scrape_event_detail(event, pool, pipeline, limit):
+    """
+    Deep scrape one event, isolating failures so one broken page doesn't sink the rest.
+    """
+    try:
+        async with limit:
+            print(f"Processing: {event['title']}")
+            html = None
+            if DETAIL_FETCH == "http":
+                with tracer.span("http_fetch", url=event['url']):
+                    html = await asyncio.to_thread(fetch_static_html, event['url'])
+
+            if html is None:
+                # Each event gets its own page from the pool so detail pages load in parallel
+                async with pool.page(NETWORK_POLICIES[2]) as page:
+                    with tracer.span("navigate", url=event['url']):
+                        await page.goto(event['url'], wait_until="domcontentloaded")
+                    # Optional: wait for body text to ensure load
+                    # await page.wait_for_selector('.field--name-body, .region-content', timeout=3000)
+                    html = await page.content()
+
+        # Fields are extracted on a worker process while the next detail page loads
+        with tracer.span("html_parse", url=event['url']):
+            return await pipeline.run(parse_event_detail, event, html)
+
+    except Exception as e:
+        print(f"Error parsing {event['url']}: {e}")
+        return None
+
+async def scrape_2(link, department, series, pool, pipeline, window):
+    # 1. The row's Date Window (default now to +14 days; see date_window.py)
+    print(f"Filter Window: {window.first} to {window.last}")
+
+    # Borrow a warm page from the shared browser pool for the listing
+    policy = NETWORK_POLICIES[2]
+    html = None
+    async with pool.page(policy) as page:
 
         try:
-            # --- STEP 1: Scrape Main List & Filter ---
+            # --- STEP 1: Scrape Main List ---
             print(f"Navigating to main list: {link}")
-            page.goto(link, wait_until="domcontentloaded")
-            
-            soup_main = BeautifulSoup(page.content(), 'html.parser')
-            view_content = soup_main.find('div', class_='view-content')
+            with tracer.span("navigate", url=link):
+                await page.goto(link, wait_until="domcontentloaded")
+            await policy.wait_ready(page)
             
-            if not view_content:
-                print("Could not find event list container.")
-                return None
-
-            articles = view_content.find_all('article', class_='cu-event')
-            events_to_visit = []
-
-            for article in articles:
-                # A. Get Timestamp (Fast & Reliable attribute)
-                time_div = article.find('div', class_='event-time')
-                if not time_div or not time_div.has_attr('data-start-time'):
-                    continue
-
-                try:
-                    event_ts = int(time_div['data-start-time'])
-                except ValueError:
-                    continue
-
-                # B. Date Filter
-                if now_ts <= event_ts <= end_ts:
-                    
-                    # Get URL
-                    link_tag = article.find('a', href=True)
-                    if not link_tag: continue
-                    url = link_tag['href']
-                    if url.startswith("/"):
-                        url = urljoin(link, url)
-                    
-                    # Get Title
-                    title_tag = article.find('span', class_='field--name-title')
-                    title = title_tag.get_text(strip=True) if title_tag else "No Title"
-
-                    events_to_visit.append({
-                        "title": title,
-                        "url": url,
-                        "start_timestamp": event_ts,
-                        "department": department,
-                        "series": series
-                    })
-
-            print(f"Found {len(events_to_visit)} events in window. Starting deep scrape...")
-
-            # --- STEP 2: Deep Scrape Each Event ---
-            for event in events_to_visit:
-                print(f"Processing: {event['title']}")
-                
-                try:
-                    page.goto(event['url'], wait_until="domcontentloaded")
-                    # Optional: wait for body text to ensure load
-                    # page.wait_for_selector('.field--name-body, .region-content', timeout=3000)
-
-                    sub_soup = BeautifulSoup(page.content(), 'html.parser')
-                    
-                    # --- PARSING LOGIC (Based on Drupal Structure) ---
-
-                    # 1. Location
-                    # Look for explicit field OR generic class with 'location'
-                    loc_div = sub_soup.find('div', class_=lambda c: c and 'field--name-field-event-location' in c)
-                    if not loc_div:
-                        loc_div = sub_soup.find('div', class_=lambda c: c and 'location' in c.lower())
-                    event['location'] = loc_div.get_text(strip=True) if loc_div else "Location not specified"
-
-                    # 2. Speaker Name
-                    # Look for explicit field OR generic class with 'speaker'
-                    speaker_div = sub_soup.find('div', class_=lambda c: c and 'field--name-field-speaker' in c)
-                    if not speaker_div:
-                        speaker_div = sub_soup.find('div', class_=lambda c: c and 'speaker' in c.lower())
-                    event['speaker'] = speaker_div.get_text(strip=True) if speaker_div else "See Abstract"
-
-                    # 3. Body Text (Abstract + Bio + Affiliation)
-                    # Drupal puts main content in 'field--name-body'
-                    body_div = sub_soup.find('div', class_='field--name-body')
-                    
-                    # Fallback: If no specific body field, grab the main content region
-                    if not body_div:
-                        body_div = sub_soup.find('div', class_='region-content')
-
-                    full_text = body_div.get_text("\n", strip=True) if body_div else ""
-                    
-                    # --- INTELLIGENT SPLITTING ---
-                    # Separate Abstract from Bio using regex patterns
-                    
-                    # Pattern 1: "About the speaker"
-                    if re.search(r'about\s+the\s+speaker', full_text, re.IGNORECASE):
-                        parts = re.split(r'about\s+the\s+speaker', full_text, flags=re.IGNORECASE, maxsplit=1)
-                        event['abstract'] = parts[0].strip()
-                        event['speaker_bio'] = parts[1].strip()
-                    
-                    # Pattern 2: "Bio:"
-                    elif re.search(r'\bbio:', full_text, re.IGNORECASE):
-                        parts = re.split(r'\bbio:', full_text, flags=re.IGNORECASE, maxsplit=1)
-                        event['abstract'] = parts[0].strip()
-                        event['speaker_bio'] = parts[1].strip()
-                    
-                    # Pattern 3: "Biography"
-                    elif re.search(r'\bbiography', full_text, re.IGNORECASE):
-                        parts = re.split(r'\bbiography', full_text, flags=re.IGNORECASE, maxsplit=1)
-                        event['abstract'] = parts[0].strip()
-                        event['speaker_bio'] = parts[1].strip()
-                        
-                    else:
-                        # Fallback: Everything is abstract
-                        event['abstract'] = full_text
-                        event['speaker_bio'] = "Not detected in text"
-
-                    # Add date_display and time_display for Gemini (Columbia = Eastern)
-                    try:
-                        ts = event["start_timestamp"]
-                        eastern = timezone(timedelta(hours=-5))
-                        dt = datetime.fromtimestamp(ts, tz=eastern)
-                        event["date_display"] = dt.strftime("%d-%b-%y")
-                        h, m = dt.hour, dt.minute
-                        event["time_display"] = f"{h % 12 or 12}:{m:02d} {'AM' if h < 12 else 'PM'}"
-                    except (ValueError, OSError, KeyError):
-                        event["date_display"] = ""
-                        event["time_display"] = ""
-
-                    events_data.append(event)
-
-                except Exception as e:
-                    print(f"Error parsing {event['url']}: {e}")
+            html = await page.content()
 
         except Exception as e:
             print(f"Critical Scraper Error: {e}")
-            
-        finally:
-            browser.close()
+            return None
+
+    # --- Parse & filter the listing on a worker process ---
+    try:
+        with tracer.span("html_parse"):
+            events, later = await pipeline.run(parse_listing, html, link, window.start_ts, window.end_ts, department, series)
+        if events is None:
+            print("Could not find event list container.")
+            return None
+        window.later_dates.extend(later)
+        events_to_visit = events
+        print(f"Found {len(events_to_visit)} events in window. Starting deep scrape...")
+
+    except Exception as e:
+        print(f"Critical Scraper Error: {e}")
+        return None
+
+    if not events_to_visit:
+        # No talks in the window is a valid result, not a failure
+        return SeminarFullyBaked(department=department, series=series, entries=[])
+
+    # --- STEP 2: Deep Scrape Each Event (in parallel) ---
+    limit = asyncio.Semaphore(DETAIL_CONCURRENCY)
+    results = await asyncio.gather(*(scrape_event_detail(event, pool, pipeline, limit) for event in events_to_visit))
+    events_data = [event for event in results if event]
 
     if not events_data:
+        # Every detail page failed
         return None
-    return parse_html(events_data, department, series)
+    if INCREMENTAL:
+        return await extract_incremental(events_data, department, series, entry_from_event, pipeline)
+    return await extract_with_rules(events_data, department, series, entry_from_event, pipeline)
         
-def scrape_3(link, department, series):
+async def scrape_3(link, department, series, pool, pipeline, window):
     """
     Scrape method for columbia.seminars.app style pages.
     Targets <section id="events"> and waits for <article class="seminar-event">.
     """
-    with sync_playwright() as p:
-
-        is_headless = os.getenv("HEADLESS", "true").lower() == "true"
-        browser = p.chromium.launch(headless=is_headless, slow_mo=50)
+    source_path, screenshot_path = source_paths(department, series)
 
-        context = browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        )
-        page = context.new_page()
+    # Borrow a warm page from the shared browser pool
+    policy = NETWORK_POLICIES[3]
+    async with pool.page(policy) as page:
 
         try:
             print("Navigating to URL...")
-            # increased timeout for SPA loading
-            page.goto(link, wait_until="networkidle", timeout=60000)
+            with tracer.span("navigate", url=link):
+                await page.goto(link, wait_until="domcontentloaded")
             
             print("Waiting for seminar events to render...")
-            # Wait specifically for the event cards to appear
-            page.wait_for_selector('article.seminar-event', timeout=30000)
+            # Wait specifically for the event cards to appear instead of for the network to go idle
+            await policy.wait_ready(page)
 
             # Extract specific section to reduce noise for the LLM (removes navbars/modals)
-            html = page.locator('section#events').inner_html()
+            html = await page.locator('section#events').inner_html()
             
             if not html:
                 print("Warning: section#events was empty or not found.")
-                html = page.content() # Fallback to full page
+                html = await page.content() # Fallback to full page
+        
+        except Exception as e:
+            print(f"Scraping failed: {e}")
+            await page.screenshot(path=str(screenshot_path))
+            print(f"Screenshot saved to {screenshot_path}")
+            return None
 
-            soup = BeautifulSoup(html, 'html.parser')
+    # Keep only the event cards (on a worker process, with the page already back in the pool)
+    with tracer.span("html_parse"):
+        events_html, articles = await pipeline.run(parse_spa_page, html)
 
-            # Find all event articles and limit to top 5
-            articles = soup.find_all('article', class_='seminar-event')
-            top_articles = articles[:5]
+    print(f"Found {len(articles)} events.")
 
-            # Rebuild a minimal HTML structure with only the top 5 events
-            new_soup = BeautifulSoup("<html><body><section id='events'></section></body></html>", "html.parser")
-            section = new_soup.find("section")
+    with open(source_path, 'w', encoding='utf-8') as f:
+        f.write(events_html)
 
-            for article in top_articles:
-                section.append(article)
-            
-            print(f"Truncated HTML to top {len(top_articles)} events.")
+    print(f"HTML written to {source_path}...")
 
-            with open('source.html', 'wb') as f:
-                f.write(new_soup.encode('utf-8'))
+    articles = await apply_window(articles, window, pipeline)
 
-            print(f"HTML written to source.html...")
-        
+    if INCREMENTAL:
+        return await extract_incremental(articles, department, series, None, pipeline)
+    return await extract_with_rules(articles, department, series, None, pipeline)
+
+# Map the scrape_method column of input.csv onto its scraper
+SCRAPE_METHODS = {
+    1: scrape_1,
+    2: scrape_2,
+    3: scrape_3,
+}
+
+# --- PRE-CHECK SETTINGS ---
+# Probe each source over plain HTTP first and reuse last run's result if it hasn't changed
+PRECHECK = os.getenv("PRECHECK", "true").lower() == "true"
+source_state = SourceState(STATE_DIR / "sources.json")
+
+def precheck_variant(scrape_method, window):
+    """
+    What else a cached result depends on besides the page body, or None if the pre-check can't be trusted.
+    """
+    if scrape_method == 1:
+        # Events are filtered to the row's date window. Keyed on its length, not its dates, so an unchanged
+        # page is still skipped tomorrow; scrape_row checks the result still covers the moved window
+        return window.variant() if DATE_WINDOW else ""
+    # scrape_2 results come from the detail pages, which can change (room, abstract) while the listing stays
+    # byte-identical; unchanged events still skip Gemini through the event index.
+    # scrape_3 pages are a JS app whose HTML shell doesn't change when the events do
+    return None
+
+async def scrape_row(index, row, pool, pipeline, limit, host_limits):
+    link = row['website'].strip() # Get website link
+    department = row['department'] # Get department from CSV
+    series = row['series'] # Get series from CSV
+    scrape_method = row['scrape_method'] # Get scrape method
+    window = row_window(row) # Only events in this date window go to Gemini (window_days / window_past_days columns)
+
+    scraper = SCRAPE_METHODS.get(scrape_method)
+    if scraper is None:
+        print(f"Unknown scrape method: {scrape_method}")
+        return None
+
+    # Rows on the same host share a smaller limit so we don't hammer one department's server
+    host = urlparse(link).netloc
+    host_limit = host_limits.setdefault(host, asyncio.Semaphore(MAX_PER_HOST))
+
+    async with host_limit, limit:
+        # Every span recorded from here on (including in worker threads) is labelled with this row
+        tracer.set_row(index, department, series)
+        print(f"Processing row {index}: link={link}, department={department}, series={series}, scrape_method={scrape_method}")
+        try:
+            with tracer.span("row", scrape_method=int(scrape_method), url=link) as row_span:
+                key = row_key(index, row)
+                journaled = journal.row_result(key) if JOURNAL else None
+
+                # --- PRE-CHECK: skip the browser and Gemini entirely when the source hasn't changed ---
+                variant = precheck_variant(scrape_method, window) if PRECHECK and journaled is None else None
+                probe = None
+                state_key = source_key(link, department, series)
+                if variant is not None:
+                    with tracer.span("precheck", url=link):
+                        probe = await asyncio.to_thread(source_state.probe, state_key, link, variant)
+                if journaled is not None:
+                    print(f"Row {index} already finished before the run was interrupted, reusing its journaled result")
+                    row_span["resumed"] = True
+                    seminar_data = SeminarFullyBaked.model_validate(journaled)
+                elif probe and probe["unchanged"] and (not variant or window.admits(source_state.later_dates(state_key))):
+                    print(f"Source unchanged since last run, reusing previous result for row {index}")
+                    row_span["skipped"] = True
+                    previous = source_state.previous_result(state_key)
+                    # The window has moved on since: drop talks that are now before it
+                    seminar_data = SeminarFullyBaked.model_validate(window.refilter(previous) if variant else previous)
+                else:
+                    seminar_data = await scraper(link, department, series, pool, pipeline, window)
+                    if seminar_data is not None and probe:
+                        source_state.record(state_key, probe, variant, seminar_data.model_dump(), window.later_dates)
+                if seminar_data is not None and JOURNAL and journaled is None:
+                    journal.record_row(key, index, seminar_data.model_dump())
+
+                # None means the scrape failed; an empty SeminarFullyBaked means no talks in the window
+                row_span["entries"] = len(seminar_data.entries) if seminar_data is not None else 0
+                # Stream this series to its own shard now rather than waiting for every row
+                if seminar_data is not None and seminar_data.entries:
+                    with tracer.span("write_shard"):
+                        output_writer.write_shard(seminar_data)
+                return seminar_data
         except Exception as e:
-            print(f"Scraping failed: {e}")
-            page.screenshot(path="debug_error.png")
-            print("Screenshot saved to debug_error.png")
-            browser.close()
+            print(f"Scrape failed for row {index} (method {scrape_method}, link={link}): {e}")
+            # Return nothing so we still write output from other rows
             return None
 
-        browser.close()
-        return parse_html("./source.html", department, series)
-
+async def scrape_all(df):
+    """
+    Scrape every input.csv row concurrently, bounded by MAX_CONCURRENCY overall and MAX_PER_HOST per host.
+    Results come back in input.csv order regardless of which row finishes first.
+    """
+    limit = asyncio.Semaphore(MAX_CONCURRENCY)
+    host_limits = {}
+
+    if JOURNAL:
+        # A resumed run keeps its original run ID, so its metrics and manifest line up with the first attempt
+        tracer.run_id = journal.start(input_hash(df), tracer.run_id, len(df))
+
+    # Parse workers start first (from a forkserver, see parse_pipeline.py); then one browser shared by every row
+    async with ParsePipeline() as pipeline, BrowserPool() as pool:
+        tasks = [scrape_row(index, row, pool, pipeline, limit, host_limits) for index, row in df.iterrows()]
+        results = await asyncio.gather(*tasks)
+        print(f"Browser pool stats: {pool.stats()}")
+        print(f"Parse pipeline stats: {pipeline.stats()}")
+        print(f"Cross-series dedup stats: {dedup_index.stats()}")
+        if JOURNAL:
+            print(f"Run journal stats: {journal.stats()}")
+        print(f"Network policy stats: { {method: policy.stats() for method, policy in NETWORK_POLICIES.items()} }")
+
+    # Rows that failed or have no talks in their window are left out of the output, as before
+    return [seminar_data for seminar_data in results if seminar_data is not None and seminar_data.entries]
+
+def replay(df, path=None):
+    """
+    Rebuild the output files from a run journal, with no browser, network or Gemini.
+    Defaults to the journal for the current input.csv.
+    """
+    path = Path(path) if path else journal.path_for(input_hash(df))
+    run_id, seminars = RunJournal.replay(path)
+    all_seminars = [SeminarFullyBaked.model_validate(seminar) for seminar in seminars if seminar["entries"]]
+    print(f"Replaying {len(all_seminars)} seminars from run {run_id} ({path})...")
+    for seminar_data in all_seminars:
+        output_writer.write_shard(seminar_data)
+    output_path = output_writer.write_combined(all_seminars)
+    manifest_path = output_writer.write_manifest(run_id)
+    print(f"Wrote {output_path} and {len(output_writer.shards)} shards indexed in {manifest_path}")
 
 def main():
 
@@ -384,71 +719,38 @@ def main():
     input_path = os.path.join(script_dir, 'input.csv') # Append input.csv
     df = pd.read_csv(input_path) # Read into pandas DataFrame
 
-    output_path = Path("/app/out/apps/liontalk/src/data/seminars.json")
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+    # `python scraper.py --replay [journal.jsonl]` only regenerates output from a journal
+    if len(sys.argv) > 1 and sys.argv[1] == "--replay":
+        replay(df, sys.argv[2] if len(sys.argv) > 2 else None)
+        return
 
-    # Accumulate all fully baked seminars
-    all_seminars = []
+    # Accumulate all fully baked seminars (each series' shard is written as soon as its row finishes)
+    all_seminars = asyncio.run(scrape_all(df))
 
-    for index, row in df.iterrows():
-        link = row['website'] # Get website link
-        department = row['department'] # Get department from CSV
-        series = row['series'] # Get series from CSV
-        scrape_method = row['scrape_method'] # Get scrape method
+    # Empty fields become "N/A"; every file is written to a temp file and renamed into place
+    print(f"Writing {len(all_seminars)} seminars to {OUTPUT_DIR}...")
+    output_path = output_writer.write_combined(all_seminars)
+    manifest_path = output_writer.write_manifest(tracer.run_id)
+    print(f"Wrote {output_path} ({output_path.stat().st_size} bytes) and {len(output_writer.shards)} shards indexed in {manifest_path}")
 
-        print(f"Processing row {index}: link={link}, department={department}, series={series}, scrape_method={scrape_method}")
+    if PRECHECK:
+        source_state.save()
+        print(f"Source state saved to {source_state.path}")
 
-        try:
-            if scrape_method == 1:
-                seminar_data = scrape_1(link, department, series)
-                if seminar_data:
-                    all_seminars.append(seminar_data)
-            elif scrape_method == 2:
-                seminar_data = scrape_2(link, department, series)
-                if seminar_data:
-                    all_seminars.append(seminar_data)
-            elif scrape_method == 3:
-                seminar_data = scrape_3(link, department, series)
-                if seminar_data:
-                    all_seminars.append(seminar_data)
-            else:
-                print(f"Unknown scrape method: {scrape_method}")
-        except Exception as e:
-            print(f"Scrape failed for row {index} (method {scrape_method}, link={link}): {e}")
-            # Continue so we still write output from other rows
-
-    # Convert Pydantic objects to standard dictionaries
-    seminars_dict = [seminar.model_dump() for seminar in all_seminars]
-
-    # --- FILL EMPTY FIELDS WITH "N/A" ---
-    print("Post-processing: Filling empty fields with 'N/A'...")
-    for group in seminars_dict:
-        # 1. Clean top-level fields (department, series)
-        for key, value in group.items():
-            if value == "":
-                group[key] = "N/A"
-        
-        # 2. Clean nested entries
-        if "entries" in group and isinstance(group["entries"], list):
-            for entry in group["entries"]:
-                for key, value in entry.items():
-                    if value == "":
-                        entry[key] = "N/A"
-    # ------------------------------------
-
-    # Write all seminars as a single JSON array
-    print(f"Writing {len(all_seminars)} seminars to {output_path}...")
-    with open(output_path, "w") as f:
-        json.dump(seminars_dict, f, indent=2)
-        f.flush()
-        os.fsync(f.fileno())
-    
-    # Verify file exists and has content
-    if output_path.exists():
-        print(f"File exists: {output_path}, size: {output_path.stat().st_size} bytes")
-    else:
-        print(f"ERROR: File was not created at {output_path}")
-    
+    if INCREMENTAL:
+        event_index.save()
+        print(f"Event index saved to {event_index.path}")
+
+    llm_cache.evict()
+    print(f"Gemini cache stats: {llm_cache.stats()}")
+    print(f"Gemini rate limiter stats: {gemini_limiter.stats()}")
+
+    # Output and state are on disk, so the next run starts fresh instead of resuming this one
+    if JOURNAL:
+        journal.finish()
+
+    # Per-stage timings and token usage for this run (JSON lines + Prometheus textfile)
+    tracer.export(METRICS_DIR)
     print(f"Completed! Wrote {len(all_seminars)} seminars.")
     
 if __name__ == "__main__":
@@ -0,0 +1,99 @@
+from pathlib import Path
+from datetime import datetime, timezone
+import json, hashlib, requests
+
+from browser_pool import USER_AGENT
+from atomic_io import atomic_write
+
+def source_key(url, department, series):
+    """
+    One input.csv source. Rows sharing a website still get their own state, since the result carries their department/series.
+    """
+    return json.dumps([url, str(department), str(series)])
+
+class SourceState:
+    """
+    Per-source validators (ETag, Last-Modified, body hash) and the last good result, keyed by source_key(),
+    so an unchanged page can be skipped without launching a browser or calling Gemini.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.sources = {}
+        if self.path.exists():
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    self.sources = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Could not read source state {self.path}, starting fresh: {e}")
+                self.sources = {}
+
+    def probe(self, key, url, variant=""):
+        """
+        Cheap conditional GET of `url` for the source `key`. Returns the fresh validators plus whether the source is unchanged
+        since the last recorded result. `variant` must also match (e.g. the length of the date window a result was built for).
+        """
+        previous = self.sources.get(key, {})
+        headers = {"User-Agent": USER_AGENT}
+        if previous.get("etag"):
+            headers["If-None-Match"] = previous["etag"]
+        if previous.get("last_modified"):
+            headers["If-Modified-Since"] = previous["last_modified"]
+
+        try:
+            response = requests.get(url, headers=headers, timeout=15)
+        except requests.RequestException as e:
+            print(f"Pre-check failed for {url}: {e}")
+            return {"unchanged": False}
+
+        if response.status_code == 304:
+            probe = {
+                "etag": previous.get("etag"),
+                "last_modified": previous.get("last_modified"),
+                "body_hash": previous.get("body_hash"),
+            }
+            same_content = True
+        elif response.status_code == 200:
+            probe = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "body_hash": hashlib.sha256(response.content).hexdigest(),
+            }
+            same_content = probe["body_hash"] == previous.get("body_hash")
+        else:
+            return {"unchanged": False}
+
+        probe["unchanged"] = (
+            same_content
+            and previous.get("variant") == variant
+            and previous.get("seminar") is not None
+        )
+        return probe
+
+    def previous_result(self, key):
+        return self.sources.get(key, {}).get("seminar")
+
+    def later_dates(self, key):
+        """
+        ISO dates of the events the last result left out for being after its date window.
+        """
+        return self.sources.get(key, {}).get("later_dates", [])
+
+    def record(self, key, probe, variant, seminar, later_dates=()):
+        """
+        Remember the validators that produced a successful result.
+        """
+        if not probe.get("body_hash"):
+            return
+        self.sources[key] = {
+            "etag": probe.get("etag"),
+            "last_modified": probe.get("last_modified"),
+            "body_hash": probe["body_hash"],
+            "variant": variant,
+            "seminar": seminar,
+            "later_dates": sorted(set(later_dates)),
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+    def save(self):
+        atomic_write(self.path, json.dumps(self.sources))